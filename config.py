@@ -1,20 +1,69 @@
+import logging
 import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Mapping, Optional
 from dotenv import load_dotenv
 
-load_dotenv()
+@lru_cache(maxsize=1)
+def _load_env() -> bool:
+    """Load .env at most once; in production the environment is injected directly"""
+    if os.environ.get("APP_ENV") != "production":
+        load_dotenv()
+    return True
 
-API_KEYS = {
-    "anthropic": os.getenv("ANTHROPIC_API_KEY"),
-    "openai": os.getenv("OPENAI_API_KEY"),
-    "google": os.getenv("GOOGLE_API_KEY")
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """API keys read from the environment, built once per process"""
+    anthropic: Optional[str]
+    openai: Optional[str]
+    google: Optional[str]
+
+    @property
+    def api_keys(self) -> Dict[str, Optional[str]]:
+        return {
+            "anthropic": self.anthropic,
+            "openai": self.openai,
+            "google": self.google
+        }
+
+def load_api_keys(env: Mapping[str, str]) -> Dict[str, Optional[str]]:
+    """Pick the provider API keys out of an environment mapping"""
+    return {
+        "anthropic": env.get("ANTHROPIC_API_KEY"),
+        "openai": env.get("OPENAI_API_KEY"),
+        "google": env.get("GOOGLE_API_KEY")
+    }
+
+@lru_cache(maxsize=1)
+def settings() -> Settings:
+    """Return the process-wide settings, reading the environment only once"""
+    _load_env()
+    return Settings(**load_api_keys(os.environ))
+
+# Key shapes per provider; placeholder values from .env.template never match
+_KEY_PATTERNS = {
+    "anthropic": re.compile(r"sk-ant-[A-Za-z0-9_-]+"),
+    "openai": re.compile(r"sk-[A-Za-z0-9_-]+"),
+    "google": re.compile(r"AIza[A-Za-z0-9_-]+"),
 }
 
-# Print diagnostic info
-print("Loading API keys...")
-for service, key in API_KEYS.items():
-    if key and key != f"your_{service}_api_key_here":
-        # Only show first and last 4 characters for security
-        masked = f"{key[:4]}...{key[-4:]}" if len(key) > 8 else "****"
-        print(f"  {service}: {masked}")
-    else:
-        print(f"  {service}: NOT SET")
+@lru_cache(maxsize=32)
+def is_valid_key(service: str, key: Optional[str]) -> bool:
+    """Check a key's format once; clients sharing a key reuse the result"""
+    return bool(key) and _KEY_PATTERNS[service].fullmatch(key) is not None
+
+def validate():
+    """Log diagnostic info about which API keys are set"""
+    logging.debug("Loading API keys...")
+    for service, key in settings().api_keys.items():
+        if key and key != f"your_{service}_api_key_here":
+            # Only show first and last 4 characters for security
+            masked = f"{key[:4]}...{key[-4:]}" if len(key) > 8 else "****"
+            logging.debug(f"  {service}: {masked}")
+        else:
+            # Keep missing keys visible at the default INFO level
+            logging.warning(f"  {service}: NOT SET")
+
+API_KEYS = settings().api_keys
@@ -1,25 +1,97 @@
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    print("Anthropic library not installed. Install with: pip install anthropic")
-    ANTHROPIC_AVAILABLE = False
-
-from typing import List, Dict
-from llm.base import LLMClient, retry_with_backoff
-import asyncio
+import importlib.util
+from typing import AsyncIterator, Final, List, Dict, Sequence
+from config import is_valid_key
+from llm.base import ChatMessage, MessageLike, LLMClient, message_dicts, retry_stream, retry_with_backoff, cached_generate, request_key, get_shared_client
 import logging
+import os
+
+# The SDK is imported on first client construction rather than at module
+# import, so providers that are never used don't pay their import cost.
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
+_MISSING_SDK = "Anthropic library not installed. Install with: pip install anthropic"
+if not ANTHROPIC_AVAILABLE:
+    print(_MISSING_SDK)
+
+_anthropic = None
+
+def _load_sdk():
+    global _anthropic
+    if _anthropic is None:
+        import anthropic
+        _anthropic = anthropic
+    return _anthropic
+
+logger = logging.getLogger(__name__)
+
+# Read once at import; override via the environment to switch models
+MODEL: Final[str] = os.environ.get("ANTHROPIC_MODEL", "claude-opus-4-1-20250805")
+
+_VALID_ROLES = frozenset(("user", "assistant"))
+
+def _validate_messages(messages: Sequence[MessageLike]):
+    """Raise ValueError describing the first malformed message"""
+    for i, msg in enumerate(messages):
+        if isinstance(msg, ChatMessage):
+            role, content = msg
+        elif isinstance(msg, dict):
+            role = msg.get("role")
+            content = msg.get("content")
+        else:
+            raise ValueError(f"Message {i} must be a dictionary")
+        if role is None:
+            raise ValueError(f"Message {i} missing 'role' field")
+        if content is None:
+            raise ValueError(f"Message {i} missing 'content' field")
+        if role not in _VALID_ROLES:
+            raise ValueError(f"Message {i} has invalid role: {role}")
+        if not content or not content.strip():
+            raise ValueError(f"Message {i} has empty content")
+
+def _validate_request(system_prompt: str, messages: Sequence[MessageLike]):
+    """Reject requests the API would refuse, before any network call"""
+    if not system_prompt or not system_prompt.strip():
+        raise ValueError("System prompt cannot be empty")
+    
+    if not messages:
+        raise ValueError("Messages list cannot be empty")
+    
+    # Per-message checks are skipped under `python -O`
+    if __debug__:
+        _validate_messages(messages)
+
+def _system_blocks(system_prompt: str) -> List[Dict]:
+    """Mark the system prompt cacheable so repeated turns hit Anthropic's prompt cache"""
+    return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+def _message_payload(messages: List[ChatMessage]) -> List[Dict]:
+    """Convert messages for the API with a cache breakpoint on the newest turn.
+    
+    The next request extends this conversation, so everything up to the
+    breakpoint is served from Anthropic's prompt cache instead of re-read.
+    """
+    payload = [msg.to_dict() for msg in messages[:-1]]
+    last = messages[-1]
+    payload.append({
+        "role": last.role,
+        "content": [{"type": "text", "text": last.content, "cache_control": {"type": "ephemeral"}}]
+    })
+    return payload
 
 class ClaudeClient(LLMClient):
+    context_window = 200_000
+    
     def __init__(self, api_key: str):
         if not ANTHROPIC_AVAILABLE:
-            raise ImportError("Anthropic library not installed. Run: pip install anthropic")
+            raise ImportError(_MISSING_SDK)
         
-        if not api_key or api_key == "your_anthropic_api_key_here" or not api_key.startswith("sk-ant-"):
+        if not is_valid_key("anthropic", api_key):
             raise ValueError("Invalid Anthropic API key. Please check your .env file")
         
+        anthropic = self._anthropic = _load_sdk()
         try:
-            self.client = anthropic.Anthropic(api_key=api_key)
+            self.client = get_shared_client(
+                "anthropic", api_key, lambda: anthropic.AsyncAnthropic(api_key=api_key)
+            )
             logging.info("Anthropic client initialized successfully")
         except Exception as e:
             logging.error(f"Failed to initialize Anthropic client: {e}")
@@ -28,60 +100,39 @@ class ClaudeClient(LLMClient):
     async def generate_response(
         self, 
         system_prompt: str, 
-        messages: List[Dict],
+        messages: Sequence[MessageLike],
         temperature: float = 0.7,
         max_tokens: int = 2048
     ) -> str:
+        # Validate once up front rather than on every retry attempt
+        _validate_request(system_prompt, messages)
+        messages = self.fit_messages(system_prompt, messages, max_tokens)
+        payload = _message_payload(messages)
+        
         async def _generate():
             try:
-                # Validate inputs
-                if not system_prompt or not system_prompt.strip():
-                    raise ValueError("System prompt cannot be empty")
-                
-                if not messages:
-                    raise ValueError("Messages list cannot be empty")
-                
-                # Validate message format
-                for i, msg in enumerate(messages):
-                    if not isinstance(msg, dict):
-                        raise ValueError(f"Message {i} must be a dictionary")
-                    if "role" not in msg:
-                        raise ValueError(f"Message {i} missing 'role' field")
-                    if "content" not in msg:
-                        raise ValueError(f"Message {i} missing 'content' field")
-                    if msg["role"] not in ["user", "assistant"]:
-                        raise ValueError(f"Message {i} has invalid role: {msg['role']}")
-                    if not msg["content"] or not msg["content"].strip():
-                        raise ValueError(f"Message {i} has empty content")
-                
-                # Log the request parameters for debugging
-                logging.info(f"Making Anthropic API request with:")
-                logging.info(f"  Model: claude-opus-4-1-20250805")
-                logging.info(f"  System prompt length: {len(system_prompt)}")
-                logging.info(f"  Messages count: {len(messages)}")
-                logging.info(f"  Temperature: {temperature}")
-                logging.info(f"  Max tokens: {max_tokens}")
-                
-                # Log first few messages for debugging
-                for i, msg in enumerate(messages[:3]):
-                    logging.info(f"  Message {i}: role={msg['role']}, content_length={len(msg['content'])}")
+                logger.debug(
+                    "anthropic request model=%s sys_len=%d n_msgs=%d temp=%.2f max_tokens=%d",
+                    MODEL, len(system_prompt), len(messages), temperature, max_tokens
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    for i, msg in enumerate(messages[:3]):
+                        logger.debug("  message %d: role=%s content_length=%d", i, msg.role, len(msg.content))
                 
-                # Convert to sync call wrapped in async
-                response = await asyncio.to_thread(
-                    self.client.messages.create,
-                    model="claude-opus-4-1-20250805",
-                    system=system_prompt,
-                    messages=messages,
+                response = await self.client.messages.create(
+                    model=MODEL,
+                    system=_system_blocks(system_prompt),
+                    messages=payload,
                     temperature=temperature,
                     max_tokens=max_tokens
                 )
                 
-                if response and response.content:
+                try:
                     return response.content[0].text
-                else:
-                    raise ValueError("Empty response from Anthropic API")
+                except (AttributeError, IndexError) as e:
+                    raise ValueError("Empty response from Anthropic API") from e
                     
-            except anthropic.APIError as e:
+            except self._anthropic.APIError as e:
                 logging.error(f"Anthropic API error: {e}")
                 logging.error(f"Error type: {type(e)}")
                 logging.error(f"Error details: {e.message if hasattr(e, 'message') else 'No message'}")
@@ -91,8 +142,35 @@ class ClaudeClient(LLMClient):
             except Exception as e:
                 logging.error(f"Unexpected error calling Anthropic: {e}")
                 logging.error(f"Error type: {type(e)}")
-                import traceback
-                logging.error(f"Traceback: {traceback.format_exc()}")
+                # retry_with_backoff logs the traceback if every attempt fails
+                logger.debug("Anthropic call failed", exc_info=True)
                 raise
         
-        return await retry_with_backoff(_generate)
+        key = request_key("anthropic", MODEL, system_prompt, message_dicts(messages), temperature, max_tokens)
+        return await cached_generate(key, temperature, lambda: retry_with_backoff(_generate))
+    
+    async def stream_response(
+        self,
+        system_prompt: str,
+        messages: Sequence[MessageLike],
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        _validate_request(system_prompt, messages)
+        messages = self.fit_messages(system_prompt, messages, max_tokens)
+        
+        payload = _message_payload(messages)
+        
+        async def _stream():
+            async with self.client.messages.stream(
+                model=MODEL,
+                system=_system_blocks(system_prompt),
+                messages=payload,
+                temperature=temperature,
+                max_tokens=max_tokens
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+        
+        async for text in retry_stream(_stream):
+            yield text
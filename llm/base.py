@@ -1,29 +1,289 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Dict, NamedTuple, Optional, Sequence, Tuple, Union
 import asyncio
+import hashlib
+import json
 import logging
-import traceback
+import os
+import random
+import time
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 
+# Provider SDK clients keyed by (provider, api_key). Every LLMClient that talks
+# to the same account reuses one SDK instance and therefore one keep-alive
+# connection pool, instead of paying a fresh TCP+TLS handshake per client.
+_SHARED_CLIENTS: Dict[Tuple[str, str], Any] = {}
+
+def get_shared_client(provider: str, api_key: str, factory: Callable[[], Any]) -> Any:
+    """Return the pooled SDK client for this provider/key, creating it on first use"""
+    key = (provider, api_key)
+    client = _SHARED_CLIENTS.get(key)
+    if client is None:
+        client = _SHARED_CLIENTS[key] = factory()
+    return client
+
+async def close_shared_clients():
+    """Close every pooled SDK client. Call once on application shutdown."""
+    clients = list(_SHARED_CLIENTS.values())
+    _SHARED_CLIENTS.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if close is None:
+            continue
+        try:
+            await close()
+        except Exception as e:
+            logging.warning(f"Failed to close SDK client: {e}")
+
+# Requests currently awaiting a provider response, keyed by request_key().
+# Entries are removed as soon as the call finishes, so the map never holds
+# more than the number of concurrent requests.
+_INFLIGHT: Dict[str, asyncio.Future] = {}
+
+def request_key(*parts: Any) -> str:
+    """Stable hash of everything that determines a completion request"""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS, default=str)
+    else:
+        # Match orjson's bytes so a key doesn't depend on which encoder is installed
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'), ensure_ascii=False).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+async def coalesced(key: str, coro_factory: Callable[[], Awaitable[str]]) -> str:
+    """Run coro_factory() once for all concurrent callers sharing the same key"""
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    # Shield so one caller being cancelled doesn't cancel the others' request
+    return await asyncio.shield(task)
+
+class ResponseCache:
+    """In-memory LRU cache of completions that expire after ttl seconds"""
+    
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+    
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        self._entries.clear()
+
+# Opt-in: set LLM_RESPONSE_CACHE_TTL (seconds) to reuse completions for
+# repeated low-temperature prompts. Disabled by default.
+RESPONSE_CACHE = ResponseCache(ttl=float(os.environ.get("LLM_RESPONSE_CACHE_TTL", "0")))
+
+# Above this temperature completions vary too much to be worth caching
+CACHEABLE_MAX_TEMPERATURE = 0.2
+
+async def cached_generate(
+    key: str,
+    temperature: float,
+    coro_factory: Callable[[], Awaitable[str]]
+) -> str:
+    """Serve near-deterministic requests from RESPONSE_CACHE and coalesce misses"""
+    cacheable = RESPONSE_CACHE.enabled and temperature <= CACHEABLE_MAX_TEMPERATURE
+    if cacheable:
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            return cached
+    
+    result = await coalesced(key, coro_factory)
+    if cacheable:
+        RESPONSE_CACHE.set(key, result)
+    return result
+
+class ChatMessage(NamedTuple):
+    """One conversation turn as sent to a model; unpacks as (role, content)"""
+    role: str
+    content: str
+    
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+# Clients accept plain {"role", "content"} dicts as well as ChatMessage
+MessageLike = Union[ChatMessage, Dict]
+
+def as_chat_messages(messages: Sequence[MessageLike]) -> List[ChatMessage]:
+    """Normalize dict messages to ChatMessage once at the client boundary"""
+    return [
+        msg if isinstance(msg, ChatMessage) else ChatMessage(msg["role"], msg["content"])
+        for msg in messages
+    ]
+
+def message_dicts(messages: Sequence[MessageLike]) -> List[Dict[str, str]]:
+    """Plain {"role", "content"} form of messages, so request_key hashes
+    ChatMessages and equivalent dicts alike with either JSON encoder"""
+    return [msg.to_dict() for msg in as_chat_messages(messages)]
+
+# Optional cap on how many history messages are sent per request (0 = all).
+# Off by default: a sliding window changes the prompt prefix every turn and
+# so forfeits provider prompt caching.
+MAX_HISTORY_MESSAGES = int(os.environ.get("LLM_MAX_HISTORY_MESSAGES", "0"))
+
+def window_messages(messages: List[ChatMessage], max_messages: int) -> List[ChatMessage]:
+    """Keep the opening message, which frames the discussion, plus the newest ones"""
+    if max_messages <= 0 or len(messages) <= max_messages:
+        return messages
+    if max_messages == 1:
+        return messages[-1:]
+    return messages[:1] + messages[-(max_messages - 1):]
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), enough to budget a context window"""
+    return len(text) // 4 + 1
+
+def fit_to_context(messages: List[ChatMessage], max_input_tokens: int) -> List[ChatMessage]:
+    """Drop the oldest messages until the history fits within max_input_tokens.
+    
+    The newest message is always kept, and the trimmed history starts on a
+    user turn since providers reject conversations opening with the assistant.
+    """
+    total = 0
+    start = len(messages)
+    while start > 0:
+        cost = estimate_tokens(messages[start - 1].content)
+        if total + cost > max_input_tokens and start < len(messages):
+            break
+        total += cost
+        start -= 1
+    
+    if start == 0:
+        return messages
+    
+    while start < len(messages) - 1 and messages[start].role != "user":
+        start += 1
+    logging.warning(f"Dropped {start} oldest messages to fit the context window")
+    return messages[start:]
+
 class LLMClient(ABC):
+    # Model context window in tokens; None disables history trimming
+    context_window: Optional[int] = None
+    
+    def fit_messages(
+        self,
+        system_prompt: str,
+        messages: Sequence[MessageLike],
+        max_tokens: int
+    ) -> List[ChatMessage]:
+        """Normalize messages and trim the oldest so prompt plus completion fit the context window"""
+        messages = window_messages(as_chat_messages(messages), MAX_HISTORY_MESSAGES)
+        if self.context_window is None:
+            return messages
+        budget = self.context_window - max_tokens - estimate_tokens(system_prompt)
+        return fit_to_context(messages, budget)
+    
     @abstractmethod
     async def generate_response(
         self, 
         system_prompt: str, 
-        messages: List[Dict], 
+        messages: Sequence[MessageLike], 
         temperature: float = 0.7,
         max_tokens: int = 2048
     ) -> str:
         pass
+    
+    async def stream_response(
+        self,
+        system_prompt: str,
+        messages: Sequence[MessageLike],
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        """Yield the response text in chunks as the provider produces them.
+        
+        Clients without a streaming API yield the full response as one chunk.
+        Streaming clients wrap their provider stream in retry_stream.
+        """
+        yield await self.generate_response(
+            system_prompt=system_prompt,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+    
+    async def generate_batch(
+        self,
+        requests: List[Dict],
+        max_concurrency: int = 8
+    ) -> List[Any]:
+        """Run several generate_response calls concurrently.
+        
+        Each request is a dict of generate_response keyword arguments. At most
+        max_concurrency calls are in flight at once to stay clear of provider
+        rate limits. Results come back in request order; a failed request
+        yields its exception instead of a string.
+        
+        Provider batch endpoints (Anthropic Message Batches, OpenAI Batch) are
+        deliberately not used: they finish asynchronously, up to 24 hours
+        later, which a live discussion cannot wait for.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(request: Dict) -> str:
+            async with semaphore:
+                return await self.generate_response(**request)
+        
+        return await asyncio.gather(
+            *(run_one(request) for request in requests),
+            return_exceptions=True
+        )
+
+# 4xx statuses that still deserve a retry: timeout, conflict, rate limit
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+def is_recoverable(error: Exception) -> bool:
+    """Return False for client errors (bad request, auth, not found) that a retry cannot fix"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in RETRYABLE_STATUS_CODES
+    return True
+
+def _backoff_delay(attempt: int, base_delay: float, max_delay: float, jitter: float) -> float:
+    # Jitter spreads out coroutines that hit the same rate limit together
+    return min(max_delay, base_delay * (2 ** attempt)) * (1 + random.uniform(0, jitter))
 
 async def retry_with_backoff(
     func, 
     max_retries: int = 3,
-    base_delay: float = 1.0
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: float = 0.5
 ) -> str:
-    """Retry with exponential backoff and better error reporting"""
+    """Retry with capped, jittered exponential backoff and better error reporting"""
     last_error = None
     
     for attempt in range(max_retries):
@@ -35,19 +295,61 @@ async def retry_with_backoff(
                 raise ValueError("Empty response from API")
         except Exception as e:
             last_error = e
-            error_details = traceback.format_exc()
+            
+            if not is_recoverable(e):
+                logging.error("Unrecoverable error, not retrying: %s", e)
+                raise
             
             if attempt == max_retries - 1:
-                logging.error(f"Max retries exceeded. Last error: {e}")
-                logging.error(f"Full traceback: {error_details}")
-                raise e
+                # The traceback is only formatted here, once, by the handler
+                logging.exception("Max retries exceeded. Last error: %s", e)
+                raise
             
-            delay = base_delay * (2 ** attempt)
-            logging.warning(f"Attempt {attempt + 1} failed: {e}")
-            logging.warning(f"Retrying in {delay}s...")
+            delay = _backoff_delay(attempt, base_delay, max_delay, jitter)
+            logging.warning("Attempt %d failed: %s", attempt + 1, e)
+            logging.warning("Retrying in %.2fs...", delay)
             await asyncio.sleep(delay)
     
     # This should never be reached, but just in case
     if last_error:
         raise last_error
     return ""
+
+async def retry_stream(
+    open_stream: Callable[[], AsyncIterator[str]],
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: float = 0.5
+) -> AsyncIterator[str]:
+    """Yield from a provider stream, retrying like retry_with_backoff until
+    the first chunk arrives.
+    
+    Once text has reached the caller a retry would repeat it, so errors
+    after that point propagate.
+    """
+    for attempt in range(max_retries):
+        yielded = False
+        try:
+            async for chunk in open_stream():
+                yielded = True
+                yield chunk
+            if yielded:
+                return
+            raise ValueError("Empty response from API")
+        except Exception as e:
+            if yielded:
+                raise
+            
+            if not is_recoverable(e):
+                logging.error("Unrecoverable error, not retrying: %s", e)
+                raise
+            
+            if attempt == max_retries - 1:
+                logging.exception("Max retries exceeded. Last error: %s", e)
+                raise
+            
+            delay = _backoff_delay(attempt, base_delay, max_delay, jitter)
+            logging.warning("Stream attempt %d failed: %s", attempt + 1, e)
+            logging.warning("Retrying in %.2fs...", delay)
+            await asyncio.sleep(delay)
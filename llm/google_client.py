@@ -1,26 +1,63 @@
+import importlib.util
+from typing import AsyncIterator, Final, List, Sequence
+from config import is_valid_key
+from llm.base import ChatMessage, MessageLike, LLMClient, message_dicts, get_shared_client, retry_stream, retry_with_backoff, cached_generate, request_key
+import logging
+import os
+
+# The SDK is imported on first client construction rather than at module
+# import, so providers that are never used don't pay their import cost.
 try:
-    import google.generativeai as genai
-    GOOGLE_AVAILABLE = True
-except ImportError:
-    print("Google Generative AI library not installed. Install with: pip install google-generativeai")
+    GOOGLE_AVAILABLE = importlib.util.find_spec("google.generativeai") is not None
+except ModuleNotFoundError:
+    # find_spec imports the parent package, which may be missing too
     GOOGLE_AVAILABLE = False
+_MISSING_SDK = "Google Generative AI library not installed. Install with: pip install google-generativeai"
+if not GOOGLE_AVAILABLE:
+    print(_MISSING_SDK)
 
-from typing import List, Dict
-from llm.base import LLMClient, retry_with_backoff
-import asyncio
-import logging
+_genai = None
+
+def _load_sdk():
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        _genai = genai
+    return _genai
+
+logger = logging.getLogger(__name__)
+
+# Read once at import; override via the environment to switch models
+MODEL: Final[str] = os.environ.get("GOOGLE_MODEL", "gemini-2.5-pro")
+
+def _format_prompt(system_prompt: str, messages: List[ChatMessage]) -> str:
+    """Format messages for Gemini in one pass; repeated += would copy the
+    growing prompt on every message"""
+    return "".join((
+        system_prompt, "\n\n",
+        *(f"{role}: {content}\n\n" for role, content in messages)
+    ))
 
 class GeminiClient(LLMClient):
+    context_window = 1_048_576
+    
     def __init__(self, api_key: str):
         if not GOOGLE_AVAILABLE:
-            raise ImportError("Google Generative AI library not installed. Run: pip install google-generativeai")
+            raise ImportError(_MISSING_SDK)
         
-        if not api_key or api_key == "your_google_api_key_here" or not api_key.startswith("AIza"):
+        if not is_valid_key("google", api_key):
             raise ValueError("Invalid Google API key. Please check your .env file")
         
-        try:
+        genai = self._genai = _load_sdk()
+        
+        def _create_model():
+            # configure() resets the SDK's cached transport clients, so only
+            # run it the first time a key is used
             genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-pro')
+            return genai.GenerativeModel(MODEL)
+        
+        try:
+            self.model = get_shared_client("google", api_key, _create_model)
             logging.info("Google Gemini client initialized successfully")
         except Exception as e:
             logging.error(f"Failed to initialize Google client: {e}")
@@ -29,22 +66,23 @@ class GeminiClient(LLMClient):
     async def generate_response(
         self,
         system_prompt: str,
-        messages: List[Dict],
+        messages: Sequence[MessageLike],
         temperature: float = 0.7,
         max_tokens: int = 2048
     ) -> str:
+        messages = self.fit_messages(system_prompt, messages, max_tokens)
+        formatted_prompt = _format_prompt(system_prompt, messages)
+        
         async def _generate():
             try:
-                # Format messages for Gemini
-                formatted_prompt = system_prompt + "\n\n"
-                for msg in messages:
-                    formatted_prompt += f"{msg['role']}: {msg['content']}\n\n"
+                logger.debug(
+                    "google request model=%s prompt_len=%d n_msgs=%d temp=%.2f max_tokens=%d",
+                    MODEL, len(formatted_prompt), len(messages), temperature, max_tokens
+                )
                 
-                # Convert to sync call wrapped in async
-                response = await asyncio.to_thread(
-                    self.model.generate_content,
+                response = await self.model.generate_content_async(
                     formatted_prompt,
-                    generation_config=genai.GenerationConfig(
+                    generation_config=self._genai.GenerationConfig(
                         temperature=temperature,
                         max_output_tokens=max_tokens
                     )
@@ -59,4 +97,32 @@ class GeminiClient(LLMClient):
                 logging.error(f"Error calling Google Gemini: {e}")
                 raise
         
-        return await retry_with_backoff(_generate)
+        key = request_key("google", MODEL, system_prompt, message_dicts(messages), temperature, max_tokens)
+        return await cached_generate(key, temperature, lambda: retry_with_backoff(_generate))
+    
+    async def stream_response(
+        self,
+        system_prompt: str,
+        messages: Sequence[MessageLike],
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        messages = self.fit_messages(system_prompt, messages, max_tokens)
+        prompt = _format_prompt(system_prompt, messages)
+        
+        async def _stream():
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=self._genai.GenerationConfig(
+                    temperature=temperature,
+                    max_output_tokens=max_tokens
+                ),
+                stream=True
+            )
+            async for chunk in response:
+                # Chunks without parts (e.g. a trailing safety verdict) carry no text
+                if chunk.parts:
+                    yield chunk.text
+        
+        async for text in retry_stream(_stream):
+            yield text
@@ -1,25 +1,51 @@
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    print("OpenAI library not installed. Install with: pip install openai")
-    OPENAI_AVAILABLE = False
-
-from typing import List, Dict
-from llm.base import LLMClient, retry_with_backoff
-import asyncio
+import importlib.util
+from typing import AsyncIterator, Final, Sequence
+from config import is_valid_key
+from llm.base import MessageLike, LLMClient, message_dicts, retry_stream, retry_with_backoff, cached_generate, request_key, get_shared_client
+import hashlib
 import logging
+import os
+
+# The SDK is imported on first client construction rather than at module
+# import, so providers that are never used don't pay their import cost.
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+_MISSING_SDK = "OpenAI library not installed. Install with: pip install openai"
+if not OPENAI_AVAILABLE:
+    print(_MISSING_SDK)
+
+_openai = None
+
+def _load_sdk():
+    global _openai
+    if _openai is None:
+        import openai
+        _openai = openai
+    return _openai
+
+logger = logging.getLogger(__name__)
+
+# Read once at import; override via the environment to switch models
+MODEL: Final[str] = os.environ.get("OPENAI_MODEL", "gpt-5-2025-08-07")
+
+def _prompt_cache_key(system_prompt: str) -> str:
+    """Route requests sharing a system prompt to the same OpenAI prompt cache"""
+    return hashlib.blake2b(system_prompt.encode(), digest_size=16).hexdigest()
 
 class GPTClient(LLMClient):
+    context_window = 400_000
+    
     def __init__(self, api_key: str):
         if not OPENAI_AVAILABLE:
-            raise ImportError("OpenAI library not installed. Run: pip install openai")
+            raise ImportError(_MISSING_SDK)
         
-        if not api_key or api_key == "your_openai_api_key_here" or not api_key.startswith("sk-"):
+        if not is_valid_key("openai", api_key):
             raise ValueError("Invalid OpenAI API key. Please check your .env file")
         
+        openai = self._openai = _load_sdk()
         try:
-            self.client = openai.OpenAI(api_key=api_key)
+            self.client = get_shared_client(
+                "openai", api_key, lambda: openai.AsyncOpenAI(api_key=api_key)
+            )
             logging.info("OpenAI client initialized successfully")
         except Exception as e:
             logging.error(f"Failed to initialize OpenAI client: {e}")
@@ -28,34 +54,66 @@ class GPTClient(LLMClient):
     async def generate_response(
         self,
         system_prompt: str,
-        messages: List[Dict],
+        messages: Sequence[MessageLike],
         temperature: float = 0.7,
         max_tokens: int = 2048
     ) -> str:
+        messages = self.fit_messages(system_prompt, messages, max_tokens)
+        
         async def _generate():
             try:
-                messages_formatted = [{"role": "system", "content": system_prompt}] + messages
+                messages_formatted = [{"role": "system", "content": system_prompt}, *(msg.to_dict() for msg in messages)]
+                logger.debug(
+                    "openai request model=%s sys_len=%d n_msgs=%d max_tokens=%d",
+                    MODEL, len(system_prompt), len(messages), max_tokens
+                )
                 
-                # Convert to sync call wrapped in async
                 # GPT-5 uses max_completion_tokens instead of max_tokens
                 # GPT-5 only supports default temperature (1), so we omit temperature parameter
-                response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
-                    model="gpt-5-2025-08-07",
+                response = await self.client.chat.completions.create(
+                    model=MODEL,
                     messages=messages_formatted,
-                    max_completion_tokens=max_tokens
+                    max_completion_tokens=max_tokens,
+                    extra_body={"prompt_cache_key": _prompt_cache_key(system_prompt)}
                 )
                 
-                if response and response.choices and response.choices[0].message:
+                try:
                     return response.choices[0].message.content
-                else:
-                    raise ValueError("Empty response from OpenAI API")
+                except (AttributeError, IndexError) as e:
+                    raise ValueError("Empty response from OpenAI API") from e
                     
-            except openai.APIError as e:
+            except self._openai.APIError as e:
                 logging.error(f"OpenAI API error: {e}")
                 raise
             except Exception as e:
                 logging.error(f"Unexpected error calling OpenAI: {e}")
                 raise
         
-        return await retry_with_backoff(_generate)
+        key = request_key("openai", MODEL, system_prompt, message_dicts(messages), temperature, max_tokens)
+        # GPT-5 always samples at its default temperature of 1, whatever was requested
+        return await cached_generate(key, 1.0, lambda: retry_with_backoff(_generate))
+    
+    async def stream_response(
+        self,
+        system_prompt: str,
+        messages: Sequence[MessageLike],
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> AsyncIterator[str]:
+        messages = self.fit_messages(system_prompt, messages, max_tokens)
+        messages_formatted = [{"role": "system", "content": system_prompt}, *(msg.to_dict() for msg in messages)]
+        
+        async def _stream():
+            stream = await self.client.chat.completions.create(
+                model=MODEL,
+                messages=messages_formatted,
+                max_completion_tokens=max_tokens,
+                stream=True,
+                extra_body={"prompt_cache_key": _prompt_cache_key(system_prompt)}
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        
+        async for text in retry_stream(_stream):
+            yield text
@@ -1,19 +1,34 @@
 import asyncio
+import bisect
 import uuid
+from collections import deque
 from datetime import datetime
 from typing import Optional
+# config loads .env, so import it before the clients read their MODEL overrides
+from config import API_KEYS, validate as validate_config
 from models.discussion import DiscussionState, Round, Message, Role
 from llm.anthropic_client import ClaudeClient
 from llm.openai_client import GPTClient
 from llm.google_client import GeminiClient
+from llm.base import ChatMessage, close_shared_clients
 from moderator.turn_manager import TurnManager
 from ui.terminal import TerminalUI
 from storage.session_logger import SessionLogger
-from config import API_KEYS
 import signal
 import sys
 import traceback
 
+# uvloop's libuv-based event loop dispatches socket I/O faster than the
+# default selector loop; fall back to asyncio when it isn't installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Upper bound on LLM calls in flight at once when panelists speak in parallel
+MAX_CONCURRENT_CALLS = 3
+
 class RoundtableApp:
     def __init__(self):
         self.ui = TerminalUI()
@@ -42,8 +57,26 @@ class RoundtableApp:
             "gpt5": "GPT-5 Thinking",
             "gemini": "Gemini 2.5 Pro"
         }
+        self.participant_prefixes = {
+            pid: f"[{model}]: " for pid, model in self.participant_models.items()
+        }
         
         self.current_session_file = None
+        self.histories = {}  # participant_id -> ChatMessage history
+        self.transcript_lines = []  # "[model]: content" per transcript message
+
+        # Prompt files are read once; with 4 rounds x 2 roles every system
+        # prompt can be formatted up front instead of on each turn
+        moderator_prompt, panelist_prompt = self.load_prompts()
+        self.system_prompts = {
+            (rnd, is_moderator): (moderator_prompt if is_moderator else panelist_prompt).format(
+                round=rnd.value,
+                round_name=self.ui.round_names[rnd]
+            )
+            for rnd in Round
+            for is_moderator in (True, False)
+        }
+        self.llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
         
         # Handle Ctrl+C gracefully
         signal.signal(signal.SIGINT, self.handle_interrupt)
@@ -81,47 +114,63 @@ class RoundtableApp:
         self,
         participant_id: str,
         state: DiscussionState,
-        is_moderator: bool = False
+        is_moderator: bool = False,
+        stream: bool = False
     ) -> str:
-        """Generate response from LLM with better error handling"""
-        moderator_prompt, panelist_prompt = self.load_prompts()
+        """Generate response from LLM with better error handling.
+        
+        With stream=True the response is rendered as it arrives; the client
+        retries the stream with backoff until its first chunk arrives.
+        """
+        # Format each new transcript message once; every participant's history
+        # shares the same string
+        lines = self.transcript_lines
+        for msg in state.transcript[len(lines):]:
+            lines.append(self.participant_prefixes[msg.participant_id] + msg.content)
         
-        # Prepare conversation history
-        history = []
-        for msg in state.transcript:
-            history.append({
-                "role": "assistant" if msg.participant_id == participant_id else "user",
-                "content": f"[{msg.participant_model}]: {msg.content}"
-            })
+        # Extend this participant's history with messages added since its last
+        # turn; earlier entries never change, so the provider's cached prompt
+        # prefix stays byte-identical from one turn to the next
+        history = self.histories.setdefault(participant_id, [])
+        for i in range(len(history), len(state.transcript)):
+            history.append(ChatMessage(
+                "assistant" if state.transcript[i].participant_id == participant_id else "user",
+                lines[i]
+            ))
         
         # If this is the first message in the discussion, add a default user message
-        if not history:
-            history.append({
-                "role": "user",
-                "content": f"Let's begin the discussion on: {state.topic}"
-            })
+        messages = history or [ChatMessage(
+            "user",
+            f"Let's begin the discussion on: {state.topic}"
+        )]
         
         # Select appropriate prompt
-        if is_moderator:
-            system_prompt = moderator_prompt.format(
-                round=state.current_round.value,
-                round_name=self.ui.round_names[state.current_round]
-            )
-        else:
-            system_prompt = panelist_prompt.format(
-                round=state.current_round.value,
-                round_name=self.ui.round_names[state.current_round]
-            )
+        system_prompt = self.system_prompts[state.current_round, is_moderator]
         
         # Generate response with error details
         client = self.clients[participant_id]
         
         try:
-            response = await client.generate_response(
-                system_prompt=system_prompt,
-                messages=history,
-                temperature=0.7
-            )
+            async with self.llm_semaphore:
+                if stream:
+                    response = await self.ui.stream_message(
+                        participant_id,
+                        self.participant_models[participant_id],
+                        is_moderator,
+                        client.stream_response(
+                            system_prompt=system_prompt,
+                            messages=messages,
+                            temperature=0.7
+                        )
+                    )
+                    if not response.strip():
+                        raise ValueError(f"Empty response from {participant_id}")
+                else:
+                    response = await client.generate_response(
+                        system_prompt=system_prompt,
+                        messages=messages,
+                        temperature=0.7
+                    )
             return response
         except Exception as e:
             self.ui.console.print(f"[red]Error from {participant_id}: {str(e)}[/red]")
@@ -143,144 +192,184 @@ class RoundtableApp:
             started_at=datetime.now(),
             completed_at=None
         )
+        self.histories = {}
+        self.transcript_lines = []
         
+        recent_messages = deque(maxlen=3)
         turn_number = 0
         retry_count = 0
         max_retries = 3
         
-        while self.current_state.status == "in_progress":
-            # Display current state
-            self.ui.clear_screen()
-            self.ui.display_header(topic, self.current_state.current_round)
-            
-            # Show recent messages (last 3)
-            for msg in self.current_state.transcript[-3:]:
-                self.ui.display_message(msg)
-            
-            # Determine next speaker
-            next_speaker = self.turn_manager.determine_next_speaker(self.current_state)
-            self.current_state.current_speaker = next_speaker
-            
-            # Generate response
-            self.ui.display_thinking(next_speaker)
-            
-            is_moderator = next_speaker == "claude_moderator"
-            
-            try:
-                response = await self.generate_response(
-                    next_speaker,
-                    self.current_state,
-                    is_moderator
+        # Log each message as it arrives; the full JSON snapshot is only written at the end
+        with self.logger.open_stream(self.current_state) as transcript_log:
+            while self.current_state.status == "in_progress":
+                # Display current state
+                self.ui.clear_screen()
+                self.ui.display_header(topic, self.current_state.current_round)
+                
+                # Show recent messages (last 3)
+                for msg in recent_messages:
+                    self.ui.display_message(msg)
+                
+                # Determine next speakers; independent panelists are asked concurrently
+                speakers = self.turn_manager.determine_next_speakers(self.current_state)
+                self.current_state.current_speaker = speakers[0]
+                
+                # Generate responses
+                for speaker in speakers:
+                    self.ui.display_thinking(speaker)
+                
+                # A lone speaker's reply is streamed onto the screen as it arrives;
+                # concurrent replies are shown together once they're all in
+                stream = len(speakers) == 1
+                results = await asyncio.gather(
+                    *(self.generate_response(speaker, self.current_state, speaker == "claude_moderator", stream)
+                      for speaker in speakers),
+                    return_exceptions=True
                 )
-                retry_count = 0  # Reset retry count on success
-            except Exception as e:
-                retry_count += 1
-                self.ui.console.print(f"[red]Error generating response (attempt {retry_count}/{max_retries}): {e}[/red]")
                 
-                if retry_count >= max_retries:
-                    self.ui.console.print("[red]Max retries exceeded. Exiting.[/red]")
-                    return
+                # Add successful responses to the transcript in speaker order.
+                # They all arrived together, so one clock read stamps them all;
+                # turn_number, not timestamp, is the ordering key.
+                now = datetime.now()
+                errors = []
+                for speaker, result in zip(speakers, results):
+                    if isinstance(result, BaseException):
+                        if not isinstance(result, Exception):
+                            raise result
+                        errors.append(result)
+                        continue
+                    
+                    is_moderator = speaker == "claude_moderator"
+                    message = Message(
+                        participant_id=speaker,
+                        participant_model=self.participant_models[speaker],
+                        role=Role.MODERATOR if is_moderator else Role.PANELIST,
+                        round=self.current_state.current_round,
+                        content=result,
+                        timestamp=now,
+                        turn_number=turn_number
+                    )
+                    self.current_state.transcript.append(message)
+                    recent_messages.append(message)
+                    self.logger.append_message(transcript_log, message)
+                    turn_number += 1
                 
-                self.ui.console.print(f"[yellow]Retrying in 3 seconds...[/yellow]")
-                await asyncio.sleep(3)
-                continue
-            
-            # Add to transcript
-            message = Message(
-                participant_id=next_speaker,
-                participant_model=self.participant_models[next_speaker],
-                role=Role.MODERATOR if is_moderator else Role.PANELIST,
-                round=self.current_state.current_round,
-                content=response,
-                timestamp=datetime.now(),
-                turn_number=turn_number
-            )
-            
-            self.current_state.transcript.append(message)
-            turn_number += 1
-            
-            # Check for round advancement
-            if self.turn_manager.should_advance_round(self.current_state):
-                if self.current_state.current_round == Round.CONVERGENCE:
-                    # Discussion complete
-                    self.current_state.status = "completed"
-                    self.current_state.completed_at = datetime.now()
+                if not errors:
+                    retry_count = 0  # Reset retry count on success
+                else:
+                    # Speakers that failed are still pending and are asked again next pass
+                    e = errors[0]
+                    retry_count += 1
+                    self.ui.console.print(f"[red]Error generating response (attempt {retry_count}/{max_retries}): {e}[/red]")
                     
-                    # Extract final consensus
-                    final_message = self.current_state.transcript[-1]
-                    self.ui.display_final_consensus(final_message.content)
+                    if retry_count >= max_retries:
+                        self.ui.console.print("[red]Max retries exceeded. Exiting.[/red]")
+                        return
                     
-                    # Save final state
-                    saved_path = self.logger.save_session(self.current_state)
-                    self.ui.console.print(f"\n[green]Discussion saved to: {saved_path}[/green]")
-                else:
-                    # Advance to next round
-                    old_round = self.current_state.current_round
-                    self.current_state.current_round = Round(old_round.value + 1)
-                    self.ui.display_round_transition(old_round, self.current_state.current_round)
-                    await asyncio.sleep(2)
+                    self.ui.console.print(f"[yellow]Retrying in 3 seconds...[/yellow]")
+                    await asyncio.sleep(3)
+                    continue
+                
+                # Check for round advancement
+                if self.turn_manager.should_advance_round(self.current_state):
+                    if self.current_state.current_round == Round.CONVERGENCE:
+                        # Discussion complete
+                        self.current_state.status = "completed"
+                        self.current_state.completed_at = now
+                        
+                        # Extract final consensus
+                        final_message = self.current_state.transcript[-1]
+                        self.ui.display_final_consensus(final_message.content)
+                        
+                        # Save final state
+                        saved_path = self.logger.save_session(self.current_state)
+                        self.ui.console.print(f"\n[green]Discussion saved to: {saved_path}[/green]")
+                    else:
+                        # Advance to next round
+                        old_round = self.current_state.current_round
+                        self.current_state.current_round = Round(old_round.value + 1)
+                        self.ui.display_round_transition(old_round, self.current_state.current_round)
+                        await asyncio.sleep(2)
+        
+        if self.current_state.status == "completed":
+            # The snapshot now holds everything the log did
+            self.logger.stream_path(self.current_state).unlink(missing_ok=True)
     
     def replay_discussion(self, state: DiscussionState):
         """Replay a saved discussion"""
         self.ui.clear_screen()
         self.ui.display_header(state.topic, Round.CONVERGENCE)
         
-        current_round = Round.AGENDA
+        # Index each round's messages once so fast-forward can jump straight there
+        round_to_indices = {}
         for i, msg in enumerate(state.transcript):
-            if msg.round != current_round:
-                current_round = msg.round
-                self.ui.console.print(f"\n[bold]═══ {self.ui.round_names[current_round]} ═══[/bold]\n")
-            
-            self.ui.display_message(msg)
-            
-            # Check if we're at the final synthesis (convergence round)
-            is_final_synthesis = current_round == Round.CONVERGENCE
-            
-            # Check if this is the last message in the final synthesis round
-            is_last_message_in_final = (is_final_synthesis and 
-                                      i == len(state.transcript) - 1)
-            
-            if is_last_message_in_final:
-                # Final synthesis page - show enter to go back
-                input("\n[Press Enter to go back to main menu...]")
-                break
-            else:
-                # Not final synthesis - allow space to continue or F to fast forward
-                self.ui.console.print("\n[Press Space to continue, F to fast forward to final synthesis...]")
-                user_input = self.ui.get_single_keypress()
+            round_to_indices.setdefault(msg.round, []).append(i)
+        convergence_indices = round_to_indices.get(Round.CONVERGENCE, [])
+        
+        current_round = Round.AGENDA
+        reached_final = fast_forwarded = False
+        # Stay in keypress mode for the run of keypresses rather than per key;
+        # it is left before the input() prompts so typing is echoed again
+        with self.ui.keypress_mode():
+            for i, msg in enumerate(state.transcript):
+                if msg.round != current_round:
+                    current_round = msg.round
+                    self.ui.console.print(f"\n[bold]═══ {self.ui.round_names[current_round]} ═══[/bold]\n")
+                
+                self.ui.display_message(msg)
+                
+                # Check if we're at the final synthesis (convergence round)
+                is_final_synthesis = current_round == Round.CONVERGENCE
+                
+                # Check if this is the last message in the final synthesis round
+                is_last_message_in_final = (is_final_synthesis and 
+                                          i == len(state.transcript) - 1)
                 
-                if user_input == 'f':
-                    # Fast forward to final synthesis
-                    # Find the first message in the convergence round
-                    for j, future_msg in enumerate(state.transcript[i+1:], i+1):
-                        if future_msg.round == Round.CONVERGENCE:
+                if is_last_message_in_final:
+                    reached_final = True
+                    break
+                else:
+                    # Not final synthesis - allow space to continue or F to fast forward
+                    self.ui.console.print("\n[Press Space to continue, F to fast forward to final synthesis...]")
+                    user_input = self.ui.get_single_keypress()
+                    
+                    if user_input == 'f':
+                        # Fast forward to final synthesis
+                        # Find the first convergence message after this one
+                        start = bisect.bisect_right(convergence_indices, i)
+                        if start < len(convergence_indices):
                             # Clear screen and show header for convergence round
                             self.ui.clear_screen()
                             self.ui.display_header(state.topic, Round.CONVERGENCE)
                             self.ui.console.print(f"\n[bold]═══ {self.ui.round_names[Round.CONVERGENCE]} ═══[/bold]\n")
                             
                             # Display all convergence messages
-                            convergence_messages = [m for m in state.transcript[j:] if m.round == Round.CONVERGENCE]
-                            for conv_msg in convergence_messages:
-                                self.ui.display_message(conv_msg)
+                            for j in convergence_indices[start:]:
+                                self.ui.display_message(state.transcript[j])
                             
                             # Show final consensus if available
                             if state.status == "completed" and state.round_metadata.get("consensus"):
                                 self.ui.display_final_consensus(state.round_metadata["consensus"])
                             
-                            # Final synthesis page - show enter to go back
-                            input("\n[Press Enter to go back to main menu...]")
-                            return
-                    
-                    # If no convergence round found, show message and continue normally
-                    self.ui.console.print("[yellow]No final synthesis found in this session.[/yellow]")
-                    continue
-                elif user_input == ' ':
-                    # Space key - continue to next message (this is the normal flow)
-                    continue
-                else:
-                    # Any other key - treat as space and continue
-                    continue
+                            fast_forwarded = True
+                            break
+                        
+                        # If no convergence round found, show message and continue normally
+                        self.ui.console.print("[yellow]No final synthesis found in this session.[/yellow]")
+                        continue
+                    elif user_input == ' ':
+                        # Space key - continue to next message (this is the normal flow)
+                        continue
+                    else:
+                        # Any other key - treat as space and continue
+                        continue
+        
+        if fast_forwarded or reached_final:
+            # Final synthesis page - show enter to go back
+            input("\n[Press Enter to go back to main menu...]")
+        if fast_forwarded:
+            return
         
         # Show final consensus if available (for cases where we didn't fast forward)
         if state.status == "completed" and state.round_metadata.get("consensus"):
@@ -288,42 +377,56 @@ class RoundtableApp:
     
     async def main_loop(self):
         """Main application loop"""
-        while True:
-            choice = self.ui.display_menu()
-            
-            if choice == "1":
-                # New discussion
-                topic = self.ui.get_topic_input()
-                await self.run_discussion(topic)
-                input("\n[Press Enter to return to menu...]")
-            
-            elif choice == "2":
-                # Load previous discussion
-                sessions = self.logger.list_sessions()
-                if not sessions:
-                    self.ui.console.print("[yellow]No saved sessions found.[/yellow]")
-                    input("\n[Press Enter to continue...]")
-                    continue
+        try:
+            while True:
+                choice = self.ui.display_menu()
                 
-                # Display sessions
-                self.ui.console.print("\n[bold]Saved Sessions:[/bold]\n")
-                for i, (filename, topic, timestamp) in enumerate(sessions[:10]):
-                    self.ui.console.print(f"{i+1}. [{timestamp[:10]}] {topic}")
+                if choice == "1":
+                    # New discussion
+                    topic = self.ui.get_topic_input()
+                    await self.run_discussion(topic)
+                    input("\n[Press Enter to return to menu...]")
                 
-                selection = input("\nSelect session number (or 'c' to cancel): ")
-                if selection.lower() != 'c' and selection.isdigit():
-                    idx = int(selection) - 1
-                    if 0 <= idx < len(sessions):
-                        state = self.logger.load_session(sessions[idx][0])
-                        if state:
-                            self.replay_discussion(state)
-                        input("\n[Press Enter to return to menu...]")
-            
-            elif choice == "3":
-                # Exit
-                self.ui.console.print("[green]Thank you for using Roundtable![/green]")
-                break
+                elif choice == "2":
+                    # Load previous discussion
+                    sessions = self.logger.list_sessions()
+                    if not sessions:
+                        self.ui.console.print("[yellow]No saved sessions found.[/yellow]")
+                        input("\n[Press Enter to continue...]")
+                        continue
+                    
+                    # Display sessions
+                    self.ui.console.print("\n[bold]Saved Sessions:[/bold]\n")
+                    for i, (filename, topic, timestamp) in enumerate(sessions[:10]):
+                        # Transcript logs are sessions that stopped before they were saved
+                        interrupted = " [yellow](interrupted)[/yellow]" if filename.endswith(".jsonl") else ""
+                        self.ui.console.print(f"{i+1}. [{timestamp[:10]}] {topic}{interrupted}")
+                    
+                    selection = input("\nSelect session number (or 'c' to cancel): ")
+                    if selection.lower() != 'c' and selection.isdigit():
+                        idx = int(selection) - 1
+                        if 0 <= idx < len(sessions):
+                            state = self.logger.load_session(sessions[idx][0])
+                            if state:
+                                self.replay_discussion(state)
+                            input("\n[Press Enter to return to menu...]")
+                
+                elif choice == "3":
+                    # Exit
+                    self.ui.console.print("[green]Thank you for using Roundtable![/green]")
+                    break
+        finally:
+            # Also runs when Ctrl+C exits, so pooled connections are always closed
+            await self.shutdown()
+    
+    async def shutdown(self):
+        """Close the pooled provider connections shared by all clients"""
+        await close_shared_clients()
 
 if __name__ == "__main__":
+    validate_config()
     app = RoundtableApp()
-    asyncio.run(app.main_loop())
+    if UVLOOP_AVAILABLE:
+        uvloop.run(app.main_loop())
+    else:
+        asyncio.run(app.main_loop())
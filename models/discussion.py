@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Literal, Optional, Dict, List
+from typing import Literal, Optional, Dict, List, Set
 from enum import Enum
 
 class Role(Enum):
@@ -13,7 +13,7 @@ class Round(Enum):
     CROSS_EXAMINATION = 2
     CONVERGENCE = 3
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Message:
     participant_id: str
     participant_model: str
@@ -22,14 +22,38 @@ class Message:
     content: str
     timestamp: datetime
     turn_number: int
+    
+    def to_dict(self) -> Dict:
+        """JSON-ready form used by saved sessions"""
+        return {
+            "participant_id": self.participant_id,
+            "participant_model": self.participant_model,
+            "role": self.role.value,
+            "round": self.round.value,
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat(),
+            "turn_number": self.turn_number
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Message":
+        return cls(
+            participant_id=data["participant_id"],
+            participant_model=data["participant_model"],
+            role=Role(data["role"]),
+            round=Round(data["round"]),
+            content=data["content"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            turn_number=data["turn_number"]
+        )
 
-@dataclass
+@dataclass(slots=True)
 class CrossExamination:
     strongest_points: Dict[str, str]
     steelman_improvements: Dict[str, str]
     concrete_risks: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class DiscussionState:
     id: str
     topic: str
@@ -41,3 +65,37 @@ class DiscussionState:
     status: Literal["in_progress", "completed", "failed"]
     started_at: datetime
     completed_at: Optional[datetime]
+    
+    # Per-round index of the transcript. It is caught up lazily from the
+    # messages appended since the last lookup, so callers can keep appending
+    # to transcript directly and lookups never rescan the whole history.
+    spoken_by_round: Dict[Round, Set[str]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    count_by_round: Dict[Round, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed: int = field(default=0, init=False, repr=False, compare=False)
+    # The list the index was built from; held by reference so a replacement
+    # list is detected even if it reuses the old one's id()
+    _indexed_transcript: Optional[List[Message]] = field(default=None, init=False, repr=False, compare=False)
+    # Speaking orders fixed once per round (see TurnManager.evidence_order)
+    speaking_orders: Dict[Round, List[str]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    def _sync_round_index(self):
+        if self.transcript is not self._indexed_transcript or len(self.transcript) < self._indexed:
+            # Transcript was replaced or truncated; rebuild from scratch
+            self.spoken_by_round.clear()
+            self.count_by_round.clear()
+            self._indexed = 0
+            self._indexed_transcript = self.transcript
+        for msg in self.transcript[self._indexed:]:
+            self.spoken_by_round.setdefault(msg.round, set()).add(msg.participant_id)
+            self.count_by_round[msg.round] = self.count_by_round.get(msg.round, 0) + 1
+        self._indexed = len(self.transcript)
+    
+    def spoken_in_round(self, round: Round) -> Set[str]:
+        """Participants who have spoken in the given round"""
+        self._sync_round_index()
+        return self.spoken_by_round.get(round, set())
+    
+    def count_in_round(self, round: Round) -> int:
+        """Number of messages in the given round"""
+        self._sync_round_index()
+        return self.count_by_round.get(round, 0)
@@ -7,25 +7,36 @@ class TurnManager:
         self.panelist_ids = ["gpt5", "claude", "gemini"]
         self.moderator_id = "claude_moderator"
     
+    def evidence_order(self, state: DiscussionState) -> List[str]:
+        """Panelist order for the evidence round, shuffled once per discussion.
+        
+        The shuffle is seeded from the discussion id, so the same discussion
+        always gets the same order.
+        """
+        order = state.speaking_orders.get(Round.EVIDENCE)
+        if order is None:
+            order = self.panelist_ids[:]
+            random.Random(state.id).shuffle(order)
+            state.speaking_orders[Round.EVIDENCE] = order
+        return order
+    
     def determine_next_speaker(self, state: DiscussionState) -> str:
         """Determine who speaks next based on round and state"""
         
-        if state.current_round == Round.AGENDA:
+        if state.current_round is Round.AGENDA:
             return self.moderator_id
         
-        elif state.current_round == Round.EVIDENCE:
-            spoken = {msg.participant_id for msg in state.transcript 
-                     if msg.round == Round.EVIDENCE}
-            remaining = [p for p in self.panelist_ids if p not in spoken]
+        elif state.current_round is Round.EVIDENCE:
+            spoken = state.spoken_in_round(Round.EVIDENCE)
+            remaining = [p for p in self.evidence_order(state) if p not in spoken]
             
             if not remaining:
                 return self.moderator_id
             
-            return random.choice(remaining)
+            return remaining[0]
         
-        elif state.current_round == Round.CROSS_EXAMINATION:
-            examined = {msg.participant_id for msg in state.transcript 
-                       if msg.round == Round.CROSS_EXAMINATION}
+        elif state.current_round is Round.CROSS_EXAMINATION:
+            examined = state.spoken_in_round(Round.CROSS_EXAMINATION)
             remaining = [p for p in self.panelist_ids if p not in examined]
             
             if not remaining:
@@ -33,39 +44,55 @@ class TurnManager:
             
             return remaining[0]
         
-        elif state.current_round == Round.CONVERGENCE:
-            messages_in_round = [msg for msg in state.transcript 
-                                if msg.round == Round.CONVERGENCE]
+        elif state.current_round is Round.CONVERGENCE:
+            messages_in_round = state.count_in_round(Round.CONVERGENCE)
             
-            if len(messages_in_round) == 0:
+            if messages_in_round == 0:
                 return self.moderator_id
-            elif len(messages_in_round) <= len(self.panelist_ids):
-                responded = {msg.participant_id for msg in messages_in_round[1:]}
+            elif messages_in_round <= len(self.panelist_ids):
+                # The moderator opens the round, so only panelists can be remaining
+                responded = state.spoken_in_round(Round.CONVERGENCE)
                 remaining = [p for p in self.panelist_ids if p not in responded]
                 if remaining:
                     return remaining[0]
             
             return self.moderator_id
     
+    def determine_next_speakers(self, state: DiscussionState) -> List[str]:
+        """Determine everyone who can speak next without waiting on each other.
+        
+        Evidence and convergence responses are independent, so all remaining
+        panelists are returned together; every other turn is a single speaker.
+        """
+        if state.current_round is Round.EVIDENCE:
+            spoken = state.spoken_in_round(Round.EVIDENCE)
+            remaining = [p for p in self.evidence_order(state) if p not in spoken]
+            if remaining:
+                return remaining
+        
+        elif state.current_round is Round.CONVERGENCE:
+            if 0 < state.count_in_round(Round.CONVERGENCE) <= len(self.panelist_ids):
+                responded = state.spoken_in_round(Round.CONVERGENCE)
+                remaining = [p for p in self.panelist_ids if p not in responded]
+                if remaining:
+                    return remaining
+        
+        return [self.determine_next_speaker(state)]
+    
     def should_advance_round(self, state: DiscussionState) -> bool:
         """Check if current round is complete"""
-        if state.current_round == Round.AGENDA:
-            return any(msg.participant_id == self.moderator_id 
-                      for msg in state.transcript)
+        if state.current_round is Round.AGENDA:
+            return self.moderator_id in state.spoken_in_round(Round.AGENDA)
         
-        elif state.current_round == Round.EVIDENCE:
-            spoken = {msg.participant_id for msg in state.transcript 
-                     if msg.round == Round.EVIDENCE}
+        elif state.current_round is Round.EVIDENCE:
+            spoken = state.spoken_in_round(Round.EVIDENCE)
             return len(spoken) == len(self.panelist_ids)
         
-        elif state.current_round == Round.CROSS_EXAMINATION:
-            examined = {msg.participant_id for msg in state.transcript 
-                       if msg.round == Round.CROSS_EXAMINATION}
+        elif state.current_round is Round.CROSS_EXAMINATION:
+            examined = state.spoken_in_round(Round.CROSS_EXAMINATION)
             return len(examined) == len(self.panelist_ids)
         
-        elif state.current_round == Round.CONVERGENCE:
-            messages_in_round = [msg for msg in state.transcript 
-                                if msg.round == Round.CONVERGENCE]
-            return len(messages_in_round) >= len(self.panelist_ids) + 2
+        elif state.current_round is Round.CONVERGENCE:
+            return state.count_in_round(Round.CONVERGENCE) >= len(self.panelist_ids) + 2
         
         return False
@@ -1,20 +1,65 @@
+import gzip
 import json
 import os
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
-from models.discussion import DiscussionState, Message, Round, Role
+from typing import BinaryIO, List, Optional
+from models.discussion import DiscussionState, Message, Round
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+if MSGSPEC_AVAILABLE:
+    class _SessionFile(msgspec.Struct):
+        """Typed schema of a saved session. Decoding against it builds the
+        Message dataclasses, datetimes and enums in C instead of field by
+        field in Python."""
+        id: str
+        topic: str
+        status: str
+        started_at: datetime
+        completed_at: Optional[datetime]
+        transcript: List[Message]
+        round_metadata: dict
+    
+    _SESSION_DECODER = msgspec.json.Decoder(_SessionFile)
+    _MESSAGE_DECODER = msgspec.json.Decoder(Message)
+
+# "json" is indented and human-readable; "json.gz" is compact JSON, gzipped,
+# typically several times smaller for prose-heavy transcripts
+SESSION_FORMATS = ("json", "json.gz")
+
+# Manifest of saved sessions, so listing them doesn't parse every transcript
+INDEX_FILENAME = "_index.json"
+
+def _index_sort_key(entry: tuple) -> tuple:
+    """Sort key for index entries; saved sessions and transcript logs are
+    named differently, so order by start time rather than filename"""
+    return (entry[2] or "", entry[0])
 
 class SessionLogger:
-    def __init__(self, sessions_dir: str = "sessions"):
+    def __init__(self, sessions_dir: str = "sessions", format: Optional[str] = None):
         self.sessions_dir = Path(sessions_dir)
         self.sessions_dir.mkdir(exist_ok=True)
+        self.format = format or os.environ.get("SESSION_FORMAT", "json")
+        if self.format not in SESSION_FORMATS:
+            raise ValueError(f"Unsupported session format: {self.format}")
     
     def save_session(self, state: DiscussionState) -> str:
         """Save discussion state to disk"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_topic = "".join(c for c in state.topic if c.isalnum() or c in (' ', '-', '_'))[:50]
-        filename = f"{timestamp}_{safe_topic}.json"
+        filename = f"{timestamp}_{safe_topic}.{self.format}"
         filepath = self.sessions_dir / filename
         
         session_data = {
@@ -23,26 +68,61 @@ class SessionLogger:
             "status": state.status,
             "started_at": state.started_at.isoformat(),
             "completed_at": state.completed_at.isoformat() if state.completed_at else None,
-            "transcript": [
-                {
-                    "participant_id": msg.participant_id,
-                    "participant_model": msg.participant_model,
-                    "role": msg.role.value,
-                    "round": msg.round.value,
-                    "content": msg.content,
-                    "timestamp": msg.timestamp.isoformat(),
-                    "turn_number": msg.turn_number
-                }
-                for msg in state.transcript
-            ],
+            # orjson encodes the Message dataclasses, enums and datetimes
+            # natively, to the same shape Message.to_dict produces
+            "transcript": state.transcript if ORJSON_AVAILABLE else [msg.to_dict() for msg in state.transcript],
             "round_metadata": state.round_metadata
         }
         
-        with open(filepath, 'w') as f:
-            json.dump(session_data, f, indent=2)
+        if self.format == "json.gz":
+            payload = orjson.dumps(session_data) if ORJSON_AVAILABLE else json.dumps(session_data).encode()
+            filepath.write_bytes(gzip.compress(payload))
+        elif ORJSON_AVAILABLE:
+            filepath.write_bytes(orjson.dumps(session_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filepath, 'w') as f:
+                json.dump(session_data, f, indent=2)
+        
+        entries = self._read_index()
+        if entries is None:
+            self._rebuild_index()
+        else:
+            entries = [e for e in entries if e[0] != filename]
+            entries.append((filename, state.topic, session_data["started_at"]))
+            entries.sort(key=_index_sort_key, reverse=True)
+            self._write_index(entries)
         
         return str(filepath)
     
+    def stream_path(self, state: DiscussionState) -> Path:
+        """Path of the append-only transcript log for an in-progress session"""
+        return self.sessions_dir / f"{state.id}.jsonl"
+    
+    def open_stream(self, state: DiscussionState) -> BinaryIO:
+        """Start an append-only transcript log: a header line, then one line per message.
+        
+        Each turn costs one short write instead of re-serializing the whole
+        transcript, and a crashed session can still be loaded from the log.
+        The log is UTF-8 JSON lines, written as bytes so the locale's
+        encoding never applies.
+        """
+        header = {
+            "id": state.id,
+            "topic": state.topic,
+            "started_at": state.started_at.isoformat()
+        }
+        fh = open(self.stream_path(state), 'wb')
+        fh.write((orjson.dumps(header) if ORJSON_AVAILABLE else json.dumps(header).encode()) + b"\n")
+        fh.flush()
+        return fh
+    
+    def append_message(self, fh: BinaryIO, msg: Message):
+        """Durably append one message to a transcript log"""
+        line = orjson.dumps(msg) if ORJSON_AVAILABLE else json.dumps(msg.to_dict()).encode()
+        fh.write(line + b"\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    
     def load_session(self, filename: str) -> Optional[DiscussionState]:
         """Load discussion state from disk"""
         filepath = self.sessions_dir / filename
@@ -50,21 +130,17 @@ class SessionLogger:
         if not filepath.exists():
             return None
         
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+        if filepath.suffix == ".jsonl":
+            return self._load_stream(filepath)
         
-        transcript = [
-            Message(
-                participant_id=msg["participant_id"],
-                participant_model=msg["participant_model"],
-                role=Role(msg["role"]),
-                round=Round(msg["round"]),
-                content=msg["content"],
-                timestamp=datetime.fromisoformat(msg["timestamp"]),
-                turn_number=msg["turn_number"]
-            )
-            for msg in data["transcript"]
-        ]
+        raw = self._read_session_bytes(filepath)
+        if MSGSPEC_AVAILABLE:
+            data = msgspec.structs.asdict(_SESSION_DECODER.decode(raw))
+        else:
+            data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+            data["transcript"] = [Message.from_dict(msg) for msg in data["transcript"]]
+            data["started_at"] = datetime.fromisoformat(data["started_at"])
+            data["completed_at"] = datetime.fromisoformat(data["completed_at"]) if data["completed_at"] else None
         
         state = DiscussionState(
             id=data["id"],
@@ -72,28 +148,138 @@ class SessionLogger:
             current_round=Round(len(data["round_metadata"]) - 1) if data["round_metadata"] else Round.AGENDA,
             current_speaker=None,
             turn_order=[],
-            transcript=transcript,
+            transcript=data["transcript"],
             round_metadata=data["round_metadata"],
             status=data["status"],
-            started_at=datetime.fromisoformat(data["started_at"]),
-            completed_at=datetime.fromisoformat(data["completed_at"]) if data["completed_at"] else None
+            started_at=data["started_at"],
+            completed_at=data["completed_at"]
         )
         
         return state
     
+    def _read_session_bytes(self, filepath: Path) -> bytes:
+        """Read a saved session file's JSON, decompressing if needed"""
+        raw = filepath.read_bytes()
+        if filepath.name.endswith(".gz"):
+            raw = gzip.decompress(raw)
+        return raw
+    
+    def _read_session_data(self, filepath: Path) -> dict:
+        """Parse a saved session file in any supported format"""
+        raw = self._read_session_bytes(filepath)
+        return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    
+    def _read_session_header(self, filepath: Path) -> dict:
+        """Parse only the fields saved before the transcript.
+        
+        save_session writes id, topic, status and timestamps ahead of the
+        transcript, so listing needs just the first few KB of each file.
+        Falls back to a full parse if the prefix can't be decoded on its own.
+        For a transcript log this is its header line.
+        """
+        if filepath.suffix == ".jsonl":
+            # A transcript log's first line is its header
+            with open(filepath, 'rb') as f:
+                line = f.readline()
+            return orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+        
+        opener = gzip.open if filepath.name.endswith(".gz") else open
+        with opener(filepath, 'rb') as f:
+            head = f.read(4096)
+        prefix, sep, _ = head.partition(b'"transcript":')
+        if sep:
+            try:
+                header = prefix.rstrip().rstrip(b",") + b"}"
+                return orjson.loads(header) if ORJSON_AVAILABLE else json.loads(header)
+            except ValueError:
+                pass
+        return self._read_session_data(filepath)
+    
+    def _load_stream(self, filepath: Path) -> DiscussionState:
+        """Rebuild an interrupted session from its transcript log"""
+        with open(filepath, 'rb') as f:
+            header_line = f.readline()
+            header = orjson.loads(header_line) if ORJSON_AVAILABLE else json.loads(header_line)
+            # A crash mid-write can leave a partial last line; skip it
+            transcript = []
+            for line in f:
+                try:
+                    if MSGSPEC_AVAILABLE:
+                        transcript.append(_MESSAGE_DECODER.decode(line))
+                    else:
+                        data = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                        transcript.append(Message.from_dict(data))
+                except (ValueError, KeyError):
+                    # msgspec.DecodeError and json.JSONDecodeError are both ValueErrors
+                    break
+        
+        return DiscussionState(
+            id=header["id"],
+            topic=header["topic"],
+            current_round=transcript[-1].round if transcript else Round.AGENDA,
+            current_speaker=None,
+            turn_order=[],
+            transcript=transcript,
+            round_metadata={},
+            status="in_progress",
+            started_at=datetime.fromisoformat(header["started_at"]),
+            completed_at=None
+        )
+    
     def list_sessions(self) -> List[tuple[str, str, str]]:
-        """List all saved sessions"""
-        sessions = []
-        for filepath in sorted(self.sessions_dir.glob("*.json"), reverse=True):
+        """List all saved sessions, newest first, including the transcript
+        logs of sessions that were interrupted before they were saved"""
+        entries = self._read_index()
+        # Listing names is cheap; only re-parse sessions if the index is out of date
+        if entries is None or {e[0] for e in entries} != {p.name for p in self._session_files()}:
+            entries = self._rebuild_index()
+        return [e for e in entries if e[1] is not None]
+    
+    def _session_files(self) -> List[Path]:
+        return [
+            p for p in self.sessions_dir.iterdir()
+            if p.name.endswith((".json", ".json.gz", ".jsonl")) and p.name != INDEX_FILENAME
+        ]
+    
+    def _read_index(self) -> Optional[List[tuple[str, str, str]]]:
+        try:
+            raw = (self.sessions_dir / INDEX_FILENAME).read_bytes()
+            entries = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+            return [tuple(entry) for entry in entries]
+        except (OSError, ValueError, TypeError):
+            return None
+    
+    def _write_index(self, entries: List[tuple[str, str, str]]):
+        # Write to a temp file and rename so readers never see a partial index
+        fd, tmp_path = tempfile.mkstemp(dir=self.sessions_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(entries) if ORJSON_AVAILABLE else json.dumps(entries).encode())
+            os.replace(tmp_path, self.sessions_dir / INDEX_FILENAME)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def _rebuild_index(self) -> List[tuple[str, str, str]]:
+        """Scan every saved session and rewrite the index"""
+        headers = []
+        for filepath in self._session_files():
             try:
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    sessions.append((
-                        filepath.name,
-                        data["topic"],
-                        data["started_at"]
-                    ))
+                headers.append((filepath, self._read_session_header(filepath)))
             except:
-                continue
+                headers.append((filepath, None))
+        
+        # A log left behind after its session was saved (e.g. a crash before
+        # the log was removed) duplicates the saved copy
+        saved_ids = {data.get("id") for filepath, data in headers if data and filepath.suffix != ".jsonl"}
+        
+        sessions = []
+        for filepath, data in headers:
+            if data is None or (filepath.suffix == ".jsonl" and data["id"] in saved_ids):
+                # Keep skipped files in the index so they don't force a rescan every time
+                sessions.append((filepath.name, None, None))
+            else:
+                sessions.append((filepath.name, data["topic"], data["started_at"]))
+        sessions.sort(key=_index_sort_key, reverse=True)
+        self._write_index(sessions)
         return sessions
-    
@@ -0,0 +1,74 @@
+import asyncio
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+
+# uvloop's libuv-based event loop handles the network-bound async tests
+# faster; fall back to asyncio's default loop when it isn't installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--llm-cache", action="store_true", default=False,
+        help="Reuse real API replies to low-temperature prompts from .pytest_cache"
+    )
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Event loop that pytest-asyncio runs each async test on"""
+    if UVLOOP_AVAILABLE:
+        return {"uvloop": uvloop.new_event_loop}
+    return {"asyncio": asyncio.new_event_loop}
+
+# Fixed start of the fake test clock
+TEST_EPOCH = datetime(2024, 1, 1)
+
+@pytest.fixture(autouse=True)
+def reset_shared_clients():
+    """Keep mocked SDK clients from leaking between tests via the shared-client cache"""
+    from llm import base
+    base._SHARED_CLIENTS.clear()
+    yield
+    base._SHARED_CLIENTS.clear()
+
+@pytest.fixture(autouse=True)
+def fake_now(request, monkeypatch):
+    """Make datetime.now() in the test module tick one second per call from
+    TEST_EPOCH, so timestamps are deterministic and strictly ordered"""
+    ticks = itertools.count()
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return TEST_EPOCH + timedelta(seconds=next(ticks))
+
+    if hasattr(request.module, "datetime"):
+        monkeypatch.setattr(request.module, "datetime", FakeDatetime)
+
+@pytest.fixture
+def make_state():
+    """Build a fresh DiscussionState from fixed defaults, overriding any fields"""
+    from models.discussion import DiscussionState, Round
+
+    def factory(**overrides):
+        fields = dict(
+            id="test",
+            topic="Test",
+            current_round=Round.AGENDA,
+            current_speaker=None,
+            turn_order=[],
+            transcript=[],
+            round_metadata={},
+            status="in_progress",
+            started_at=TEST_EPOCH,
+            completed_at=None
+        )
+        fields.update(overrides)
+        return DiscussionState(**fields)
+
+    return factory
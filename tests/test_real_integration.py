@@ -9,37 +9,25 @@ These tests require real API keys to be set in environment variables:
 Set SKIP_REAL_TESTS=1 to skip these tests if API keys are not available.
 """
 
-import sys
 import os
-from pathlib import Path
-
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pytest
+import pytest_asyncio
 import asyncio
 from datetime import datetime
 from unittest.mock import patch
 import logging
-# Handle API keys for different environments (local vs CI/CD)
-import os
-from pathlib import Path
-
-# Check if .env file exists
-# Look for .env file in the project root (parent of tests directory)
-project_root = Path(__file__).parent.parent
-env_file_exists = (project_root / '.env').exists()
+import uuid
+from functools import lru_cache
 
-if env_file_exists:
-    # Local development with .env file - import from config
-    from config import API_KEYS
-else:
-    # CI/CD or no .env file - use environment variables directly
-    API_KEYS = {
-        "anthropic": os.getenv("ANTHROPIC_API_KEY"),
-        "openai": os.getenv("OPENAI_API_KEY"),
-        "google": os.getenv("GOOGLE_API_KEY")
-    }
+# config loads .env (when present) before the clients read their MODEL overrides
+from config import API_KEYS
+from models.discussion import DiscussionState, Round, Role, Message
+from moderator.turn_manager import TurnManager
+from llm.base import CACHEABLE_MAX_TEMPERATURE, request_key
+from llm.anthropic_client import ClaudeClient, MODEL as ANTHROPIC_MODEL
+from llm.openai_client import GPTClient, MODEL as OPENAI_MODEL
+from llm.google_client import GeminiClient, MODEL as GOOGLE_MODEL
 
 # Configure logging for tests
 logging.basicConfig(level=logging.INFO)
@@ -50,19 +38,19 @@ def pytest_configure(config):
         "markers", "real_api: mark test as using real API calls"
     )
 
+# Both checks run at collection and again in test_skip_conditions; the
+# environment doesn't change mid-run, so compute them once
+@lru_cache(maxsize=1)
 def check_api_keys_available():
     """Check if real API keys are available for testing"""
     required_keys = ["anthropic", "openai", "google"]
-    missing_keys = []
-    
-    for key in required_keys:
-        if not API_KEYS[key]:
-            missing_keys.append(key)
+    missing_keys = tuple(key for key in required_keys if not API_KEYS[key])
     
     if missing_keys:
         return False, missing_keys
-    return True, []
+    return True, ()
 
+@lru_cache(maxsize=1)
 def should_skip_real_tests():
     """Check if real tests should be skipped"""
     if os.getenv("SKIP_REAL_TESTS") == "1":
@@ -74,6 +62,68 @@ def should_skip_real_tests():
     
     return False, None
 
+# The SDKs' connection pools are bound to the event loop that opened them, so
+# real API tests share one session-wide loop; otherwise every test would hand
+# the pooled clients a fresh loop and redo the TCP+TLS handshake (or fail on
+# a keep-alive connection from a closed loop).
+SESSION_LOOP = pytest.mark.asyncio(loop_scope="session")
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def anthropic_client():
+    """One real Anthropic client for the whole run"""
+    client = ClaudeClient(API_KEYS["anthropic"])
+    yield client
+    await client.client.close()
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def openai_client():
+    """One real OpenAI client for the whole run"""
+    client = GPTClient(API_KEYS["openai"])
+    yield client
+    await client.client.close()
+
+@pytest.fixture(scope="session")
+def google_client():
+    """One real Google client for the whole run"""
+    return GeminiClient(API_KEYS["google"])
+
+@pytest.fixture(scope="session")
+def real_clients(anthropic_client, openai_client, google_client):
+    """The session's real clients, keyed by provider"""
+    return {"anthropic": anthropic_client, "openai": openai_client, "google": google_client}
+
+@pytest.fixture(scope="session")
+def llm_cache(request):
+    """pytest's on-disk cache when --llm-cache is given, else None"""
+    return request.config.cache if request.config.getoption("--llm-cache") else None
+
+PROBE_MODELS = {"anthropic": ANTHROPIC_MODEL, "openai": OPENAI_MODEL, "google": GOOGLE_MODEL}
+PROBE_SYSTEM_PROMPT = "You are a helpful assistant. Respond briefly."
+PROBE_MESSAGES = [{"role": "user", "content": "Say hello in exactly 3 words."}]
+
+async def probe_hello(provider: str, clients: dict, cache=None, **kwargs) -> str:
+    """Ask one provider to say hello.
+    
+    With a pytest cache (see the --llm-cache option), low-temperature replies
+    are reused across runs instead of being requested again.
+    """
+    # 0.7 is generate_response's default temperature
+    cacheable = cache is not None and kwargs.get("temperature", 0.7) <= CACHEABLE_MAX_TEMPERATURE
+    key = "roundtable/llm/" + request_key(provider, PROBE_MODELS[provider], PROBE_SYSTEM_PROMPT, PROBE_MESSAGES, kwargs)
+    if cacheable:
+        cached = cache.get(key, None)
+        if cached is not None:
+            return cached
+    
+    response = await clients[provider].generate_response(
+        system_prompt=PROBE_SYSTEM_PROMPT,
+        messages=PROBE_MESSAGES,
+        **kwargs
+    )
+    if cacheable:
+        cache.set(key, response)
+    return response
+
 # Skip condition
 skip_reason_check = should_skip_real_tests()
 skip_real_tests = skip_reason_check[0]
@@ -84,105 +134,52 @@ skip_reason = skip_reason_check[1] or "Skipping real API tests"
 class TestRealAPIIntegration:
     """Real API integration tests"""
     
-    def test_real_anthropic_client_initialization(self):
+    def test_real_anthropic_client_initialization(self, anthropic_client):
         """Test real Anthropic client initialization with actual API key"""
-        from llm.anthropic_client import ClaudeClient
-        
-        # Should not raise exception with real API key
-        client = ClaudeClient(API_KEYS["anthropic"])
+        # The fixture would have raised on an invalid real API key
+        client = anthropic_client
         assert client.client is not None
         assert hasattr(client.client, 'messages')
     
-    def test_real_openai_client_initialization(self):
+    def test_real_openai_client_initialization(self, openai_client):
         """Test real OpenAI client initialization with actual API key"""
-        from llm.openai_client import GPTClient
-        
-        # Should not raise exception with real API key
-        client = GPTClient(API_KEYS["openai"])
+        # The fixture would have raised on an invalid real API key
+        client = openai_client
         assert client.client is not None
         assert hasattr(client.client, 'chat')
     
-    def test_real_google_client_initialization(self):
+    def test_real_google_client_initialization(self, google_client):
         """Test real Google client initialization with actual API key"""
-        from llm.google_client import GeminiClient
-        
-        # Should not raise exception with real API key
-        client = GeminiClient(API_KEYS["google"])
+        # The fixture would have raised on an invalid real API key
+        client = google_client
         assert client.model is not None
         assert hasattr(client.model, 'generate_content')
     
-    @pytest.mark.asyncio
-    async def test_real_anthropic_generate_response(self):
-        """Test real Anthropic API call with simple prompt"""
-        from llm.anthropic_client import ClaudeClient
-        
-        client = ClaudeClient(API_KEYS["anthropic"])
-        
-        system_prompt = "You are a helpful assistant. Respond briefly."
-        messages = [{"role": "user", "content": "Say hello in exactly 3 words."}]
-        
-        response = await client.generate_response(
-            system_prompt=system_prompt,
-            messages=messages,
-            temperature=0.1,  # Low temperature for consistency
-            max_tokens=2048  # Increased to avoid truncation
-        )
-        
-        assert isinstance(response, str)
-        assert len(response.strip()) > 0
-        assert len(response.split()) <= 10  # Should be brief
-    
-    @pytest.mark.asyncio
-    async def test_real_openai_generate_response(self):
-        """Test real OpenAI API call with simple prompt"""
-        from llm.openai_client import GPTClient
-        
-        client = GPTClient(API_KEYS["openai"])
-        
-        system_prompt = "You are a helpful assistant. Respond briefly."
-        messages = [{"role": "user", "content": "Say hello in exactly 3 words."}]
-        
-        response = await client.generate_response(
-            system_prompt=system_prompt,
-            messages=messages,
-            max_tokens=2048  # Increased to give GPT-5 room to generate content
+    @SESSION_LOOP
+    async def test_real_providers_concurrent_hello(self, real_clients, llm_cache):
+        """Test real API calls to every provider at once, as a discussion round makes them"""
+        providers = ["anthropic", "openai", "google"]
+        results = await asyncio.gather(
+            # Low temperature for consistency; generous max_tokens to avoid truncation
+            probe_hello("anthropic", real_clients, llm_cache, temperature=0.1, max_tokens=2048),
+            # GPT-5 needs room to generate content after reasoning
+            probe_hello("openai", real_clients, llm_cache, max_tokens=2048),
+            probe_hello("google", real_clients, llm_cache, temperature=0.1, max_tokens=2048),
+            return_exceptions=True
         )
         
-        assert isinstance(response, str)
-        assert len(response.strip()) > 0
-        assert len(response.split()) <= 10  # Should be brief
-    
-    @pytest.mark.asyncio
-    async def test_real_google_generate_response(self):
-        """Test real Google API call with simple prompt"""
-        from llm.google_client import GeminiClient
-        
-        client = GeminiClient(API_KEYS["google"])
-        
-        system_prompt = "You are a helpful assistant. Respond briefly."
-        messages = [{"role": "user", "content": "Say hello in exactly 3 words."}]
+        failures = {p: r for p, r in zip(providers, results) if isinstance(r, BaseException)}
+        assert not failures, f"Provider calls failed: {failures}"
         
-        response = await client.generate_response(
-            system_prompt=system_prompt,
-            messages=messages,
-            temperature=0.1,  # Low temperature for consistency
-            max_tokens=2048  # Increased to avoid truncation
-        )
-        
-        assert isinstance(response, str)
-        assert len(response.strip()) > 0
-        assert len(response.split()) <= 10  # Should be brief
+        for provider, response in zip(providers, results):
+            assert isinstance(response, str), provider
+            assert len(response.strip()) > 0, provider
+            assert len(response.split()) <= 10, provider  # Should be brief
     
-    @pytest.mark.asyncio
-    async def test_real_discussion_flow(self):
+    @SESSION_LOOP
+    async def test_real_discussion_flow(self, anthropic_client):
         """Test a real mini discussion flow with actual API calls"""
-        from models.discussion import DiscussionState, Round, Role, Message
-        from moderator.turn_manager import TurnManager
-        from llm.anthropic_client import ClaudeClient
-        import uuid
-        
-        # Initialize real client
-        moderator_client = ClaudeClient(API_KEYS["anthropic"])
+        moderator_client = anthropic_client
         turn_manager = TurnManager()
         
         # Create simple discussion state
@@ -244,12 +241,10 @@ Your role: Set the agenda and introduce the simple question about the capital of
 class TestRealErrorHandling:
     """Test error handling with real API calls"""
     
-    @pytest.mark.asyncio
-    async def test_real_api_error_handling(self):
+    @SESSION_LOOP
+    async def test_real_api_error_handling(self, anthropic_client):
         """Test handling of real API errors (rate limits, invalid requests)"""
-        from llm.anthropic_client import ClaudeClient
-        
-        client = ClaudeClient(API_KEYS["anthropic"])
+        client = anthropic_client
         
         # Test with invalid message format (should raise ValueError)
         with pytest.raises(ValueError, match="Messages list cannot be empty"):
@@ -269,8 +264,6 @@ class TestRealErrorHandling:
     
     def test_invalid_api_key_handling(self):
         """Test handling of invalid API keys"""
-        from llm.anthropic_client import ClaudeClient
-        
         # Test with obviously invalid key
         with pytest.raises(ValueError, match="Invalid Anthropic API key"):
             ClaudeClient("invalid_key")
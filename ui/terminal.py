@@ -1,15 +1,46 @@
 import os
 import sys
-import termios
-import tty
-from typing import Optional
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
 from rich.console import Console
 from rich.panel import Panel
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.markdown import Markdown
-from rich.prompt import Prompt
-from models.discussion import DiscussionState, Round, Message
+from models.discussion import DiscussionState, Round, Message, Role
+
+# Minimum seconds between re-renders of a streaming response. Markdown is
+# re-parsed on every render, so chunks are batched rather than drawn one by one.
+STREAM_RENDER_INTERVAL = 0.1
+
+def _panel(content: str, participant_model: str, is_moderator: bool, color: str) -> Panel:
+    # rich.markdown pulls in markdown-it, the bulk of this module's import time;
+    # defer it until a message is actually rendered
+    from rich.markdown import Markdown
+    
+    role_badge = "🎯 MOD" if is_moderator else "💭"
+    
+    return Panel(
+        Markdown(content),
+        title=f"{role_badge} {participant_model}",
+        title_align="left",
+        border_style=color,
+        padding=(1, 2)
+    )
+
+def _progress_bar(current_round: Round) -> str:
+    return " ".join(
+        "●" if r.value < current_round.value else "◉" if r is current_round else "○"
+        for r in Round
+    )
+
+# Header progress bar for each round, e.g. "● ◉ ○ ○" during evidence
+_PROGRESS_BARS = {r: _progress_bar(r) for r in Round}
+
+@lru_cache(maxsize=16)
+def _message_panel(message: Message, color: str) -> Panel:
+    """Build a message's panel once; the screen is redrawn every turn but the
+    recent messages on it rarely change, and parsing Markdown is the slow part"""
+    return _panel(message.content, message.participant_model, message.role is Role.MODERATOR, color)
 
 class TerminalUI:
     def __init__(self):
@@ -26,47 +57,61 @@ class TerminalUI:
             "gemini": "yellow",
             "claude_moderator": "magenta"
         }
+        # Set while keypress_mode() holds the terminal in cbreak mode
+        self._keypress_fd: Optional[int] = None
     
     def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # Rich writes the ANSI clear sequence itself rather than spawning a shell
+        self.console.clear()
     
     def display_header(self, topic: str, current_round: Round):
         """Display discussion header"""
-        self.console.print("\n[bold white]═══ ROUNDTABLE ═══[/bold white]\n", justify="center")
-        self.console.print(f"[dim]Topic:[/dim] [bold]{topic}[/bold]\n", justify="center")
-        
-        progress_bar = ""
-        for r in Round:
-            if r.value < current_round.value:
-                progress_bar += "●"
-            elif r.value == current_round.value:
-                progress_bar += "◉"
-            else:
-                progress_bar += "○"
-            if r.value < 3:
-                progress_bar += " "
-        
-        self.console.print(f"[bold]{self.round_names[current_round]}[/bold]", justify="center")
-        self.console.print(f"[dim]{progress_bar}[/dim]\n", justify="center")
-        self.console.print("─" * 80)
+        # Buffer the prints and write the header out in one go
+        with self.console:
+            self.console.print("\n[bold white]═══ ROUNDTABLE ═══[/bold white]\n", justify="center")
+            self.console.print(f"[dim]Topic:[/dim] [bold]{topic}[/bold]\n", justify="center")
+            
+            self.console.print(f"[bold]{self.round_names[current_round]}[/bold]", justify="center")
+            self.console.print(f"[dim]{_PROGRESS_BARS[current_round]}[/dim]\n", justify="center")
+            self.console.print("─" * 80)
     
     def display_message(self, message: Message):
         """Display a single message"""
         color = self.participant_colors.get(message.participant_id, "white")
-        role_badge = "🎯 MOD" if message.role.value == "moderator" else "💭"
+        self.console.print(_message_panel(message, color))
+        self.console.print()
+    
+    async def stream_message(
+        self,
+        participant_id: str,
+        participant_model: str,
+        is_moderator: bool,
+        chunks: AsyncIterator[str]
+    ) -> str:
+        """Display a response in its panel as it streams in and return the full text"""
+        from rich.live import Live
         
-        panel_title = f"{role_badge} {message.participant_model}"
-        content = Markdown(message.content)
+        color = self.participant_colors.get(participant_id, "white")
+        parts = []
+        last_render = time.monotonic()
+        
+        with Live(
+            _panel("", participant_model, is_moderator, color),
+            console=self.console,
+            refresh_per_second=1 / STREAM_RENDER_INTERVAL
+        ) as live:
+            async for chunk in chunks:
+                parts.append(chunk)
+                now = time.monotonic()
+                if now - last_render >= STREAM_RENDER_INTERVAL:
+                    live.update(_panel("".join(parts), participant_model, is_moderator, color))
+                    last_render = now
+            
+            text = "".join(parts)
+            live.update(_panel(text, participant_model, is_moderator, color))
         
-        panel = Panel(
-            content,
-            title=panel_title,
-            title_align="left",
-            border_style=color,
-            padding=(1, 2)
-        )
-        self.console.print(panel)
         self.console.print()
+        return text
     
     def display_thinking(self, participant: str):
         """Show thinking indicator"""
@@ -75,14 +120,15 @@ class TerminalUI:
     
     def display_round_transition(self, from_round: Round, to_round: Round):
         """Display round transition"""
-        self.console.print("\n" + "="*80)
-        self.console.print(
-            f"[bold green]✓ Completed:[/bold green] {self.round_names[from_round]}"
-        )
-        self.console.print(
-            f"[bold blue]→ Starting:[/bold blue] {self.round_names[to_round]}"
-        )
-        self.console.print("="*80 + "\n")
+        with self.console:
+            self.console.print("\n" + "="*80)
+            self.console.print(
+                f"[bold green]✓ Completed:[/bold green] {self.round_names[from_round]}"
+            )
+            self.console.print(
+                f"[bold blue]→ Starting:[/bold blue] {self.round_names[to_round]}"
+            )
+            self.console.print("="*80 + "\n")
     
     def get_topic_input(self) -> str:
         """Get discussion topic from user"""
@@ -90,6 +136,8 @@ class TerminalUI:
         self.console.print("\n[bold white]═══ ROUNDTABLE ═══[/bold white]\n", justify="center")
         self.console.print("[dim]A Socratic discussion platform for LLMs[/dim]\n", justify="center")
         
+        from rich.prompt import Prompt
+        
         topic = Prompt.ask("\n[bold cyan]Enter discussion topic[/bold cyan]")
         return topic
     
@@ -98,6 +146,9 @@ class TerminalUI:
         self.clear_screen()
         self.console.print("\n[bold white]═══ ROUNDTABLE ═══[/bold white]\n", justify="center")
         
+        from rich.prompt import Prompt
+        from rich.table import Table
+        
         table = Table(show_header=False, box=None)
         table.add_column("Option", style="cyan", width=3)
         table.add_column("Description")
@@ -112,23 +163,56 @@ class TerminalUI:
     
     def display_final_consensus(self, consensus: str):
         """Display final consensus"""
-        self.console.print("\n" + "="*80)
-        self.console.print("[bold green]═══ FINAL CONSENSUS ═══[/bold green]", justify="center")
-        self.console.print("="*80 + "\n")
+        with self.console:
+            self.console.print("\n" + "="*80)
+            self.console.print("[bold green]═══ FINAL CONSENSUS ═══[/bold green]", justify="center")
+            self.console.print("="*80 + "\n")
+            
+            from rich.markdown import Markdown
+            
+            panel = Panel(
+                Markdown(consensus),
+                border_style="green",
+                padding=(1, 2)
+            )
+            self.console.print(panel)
+    
+    @contextmanager
+    def keypress_mode(self):
+        """Hold the terminal in cbreak mode for a run of keypresses.
+        
+        get_single_keypress then reads keys directly instead of switching
+        terminal modes around every press. Unlike raw mode, cbreak keeps
+        output processing and Ctrl+C, so panels print normally meanwhile.
+        """
+        if os.name == 'nt' or self._keypress_fd is not None or not sys.stdin.isatty():
+            yield
+            return
+        
+        import termios
+        import tty
         
-        panel = Panel(
-            Markdown(consensus),
-            border_style="green",
-            padding=(1, 2)
-        )
-        self.console.print(panel)
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        self._keypress_fd = fd
+        try:
+            yield
+        finally:
+            self._keypress_fd = None
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
     
     def get_single_keypress(self) -> str:
         """Get a single keypress without requiring Enter"""
         if os.name == 'nt':  # Windows
             import msvcrt
             return msvcrt.getch().decode('utf-8').lower()
+        elif self._keypress_fd is not None:
+            return sys.stdin.read(1).lower()
         else:  # Unix/Linux/macOS
+            import termios
+            import tty
+            
             fd = sys.stdin.fileno()
             old_settings = termios.tcgetattr(fd)
             try:
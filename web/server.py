@@ -3,42 +3,84 @@ import json
 import logging
 import os
 import signal
-import sys
+import socket
 import traceback
 import uuid
 import websockets
 from datetime import datetime
-from pathlib import Path
-from typing import Set, Optional
+from typing import List, Set, Optional
 from websockets.server import WebSocketServerProtocol
 
-# Add parent directory to path to import roundtable modules
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
+# config loads .env, so import it before the clients read their MODEL overrides
+from config import API_KEYS
 from models.discussion import DiscussionState, Round, Message, Role
 from llm.anthropic_client import ClaudeClient
 from llm.openai_client import GPTClient
 from llm.google_client import GeminiClient
+from llm.base import ChatMessage
 from moderator.turn_manager import TurnManager
 from storage.session_logger import SessionLogger
-from config import API_KEYS
-from web.web_ui import WebUI
+from web.web_ui import ROUND_NAMES, WebUI
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+def _dumps(message: dict) -> str:
+    """Encode an outgoing message; the browser client JSON.parses text frames,
+    so orjson's bytes are decoded rather than sent as a binary frame"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+    # Match orjson's output: compact separators, raw UTF-8 rather than \u escapes
+    return json.dumps(message, separators=(',', ':'), ensure_ascii=False)
+
+# Linux only: holding a corked socket lets a burst of small frames leave in
+# full TCP segments instead of one packet per frame
+_TCP_CORK = getattr(socket, "TCP_CORK", None)
+
+def _set_cork(sock, enabled: bool):
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, int(enabled))
+    except OSError:
+        # Not a TCP socket, or already closed
+        pass
+
+def _loads(raw_message):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return orjson.loads(raw_message) if ORJSON_AVAILABLE else json.loads(raw_message)
+
 class WebSocketManager:
     def __init__(self):
         self.clients: Set[WebSocketServerProtocol] = set()
         self.client_sessions: dict = {}  # Store individual sessions per client
         self.client_states: dict = {}  # Track state for each client
+        self.session_lists: dict = {}  # Session listing last shown to each client
+        self.handler_tasks: Set[asyncio.Task] = set()  # One per open connection
+        self.session_logger = SessionLogger()
         
     def _get_client_key(self, websocket: WebSocketServerProtocol) -> str:
         """Get a stable key for the websocket"""
-        return f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
+        # Computed once per connection; remote_address is None once the
+        # socket has closed, which is exactly when cleanup needs the key
+        key = getattr(websocket, "_client_key", None)
+        if key is None:
+            key = websocket._client_key = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
+        return key
         
     async def register_client(self, websocket: WebSocketServerProtocol):
         """Register a new WebSocket client"""
+        self._get_client_key(websocket)
         self.clients.add(websocket)
         logger.info(f"Client {websocket.remote_address} connected")
         
@@ -54,6 +96,7 @@ class WebSocketManager:
             del self.client_sessions[client_key]
         if client_key in self.client_states:
             del self.client_states[client_key]
+        self.session_lists.pop(client_key, None)
             
         logger.info(f"Client {websocket.remote_address} disconnected and cleaned up")
     
@@ -63,19 +106,54 @@ class WebSocketManager:
     
     async def send_to_client(self, websocket: WebSocketServerProtocol, message: dict):
         """Send message to specific client"""
+        await self._send_frame(websocket, _dumps(message))
+    
+    async def broadcast(self, message: dict):
+        """Send one message to every connected client, encoding it only once"""
+        # websockets.broadcast frames the message once and writes it to each
+        # open connection without waiting on any of them; closed ones are
+        # skipped and cleaned up by unregister_client
+        websockets.broadcast(self.clients, _dumps(message))
+    
+    def cancel_handlers(self):
+        """Cancel every connection handler, including any discussion it is
+        running; used when shutdown can't wait for discussions to finish"""
+        for task in tuple(self.handler_tasks):
+            task.cancel()
+    
+    async def _send_frame(self, websocket: WebSocketServerProtocol, frame: str):
         try:
-            await websocket.send(json.dumps(message))
+            await websocket.send(frame)
         except websockets.exceptions.ConnectionClosed:
             self.clients.discard(websocket)
         except Exception as e:
             logger.error(f"Error sending message to client: {e}")
+    
+    async def send_many_to_client(self, websocket: WebSocketServerProtocol, messages: List[dict]):
+        """Send a burst of messages to a specific client, in order"""
+        sock = websocket.transport.get_extra_info('socket') if _TCP_CORK is not None else None
+        if sock is not None:
+            _set_cork(sock, True)
+        try:
+            for message in messages:
+                await websocket.send(_dumps(message))
+        except websockets.exceptions.ConnectionClosed:
+            self.clients.discard(websocket)
+        except Exception as e:
+            logger.error(f"Error sending messages to client: {e}")
+        finally:
+            if sock is not None:
+                _set_cork(sock, False)
 
 class WebRoundtableSession:
+    # Formatted system prompts, shared by every session in the process
+    _shared_system_prompts: Optional[dict] = None
+    
     def __init__(self, websocket_manager: WebSocketManager, websocket: WebSocketServerProtocol):
         self.ws_manager = websocket_manager
         self.websocket = websocket
         self.ui = WebUI(websocket_manager, websocket)
-        self.logger = SessionLogger()
+        self.logger = websocket_manager.session_logger
         self.turn_manager = TurnManager()
         
         # Check API keys
@@ -100,8 +178,36 @@ class WebRoundtableSession:
             "gpt5": "GPT-5 Thinking",
             "gemini": "Gemini 2.5 Pro"
         }
+        self.participant_prefixes = {
+            pid: f"[{model}]: " for pid, model in self.participant_models.items()
+        }
         
         self.current_state = None
+        self.histories = {}  # participant_id -> ChatMessage history
+        self.transcript_lines = []  # "[model]: content" per transcript message
+        
+        self.system_prompts = self.shared_system_prompts()
+    
+    @classmethod
+    def shared_system_prompts(cls) -> dict:
+        """Return the system prompt for every (round, is_moderator) pair.
+        
+        Prompt files are read once per process; with 4 rounds x 2 roles every
+        system prompt can be formatted up front instead of on each turn.
+        start_server calls this at boot so no session does file I/O on the
+        event loop.
+        """
+        if cls._shared_system_prompts is None:
+            moderator_prompt, panelist_prompt = cls.load_prompts()
+            cls._shared_system_prompts = {
+                (rnd, is_moderator): (moderator_prompt if is_moderator else panelist_prompt).format(
+                    round=rnd.value,
+                    round_name=ROUND_NAMES[rnd]
+                )
+                for rnd in Round
+                for is_moderator in (True, False)
+            }
+        return cls._shared_system_prompts
     
     def check_api_keys(self):
         """Check if API keys are set"""
@@ -115,7 +221,8 @@ class WebRoundtableSession:
             logger.warning("Please set up your API keys in a .env file")
             raise Exception(f"Missing API keys: {', '.join(missing_keys)}. Please create a .env file with your API keys.")
     
-    def load_prompts(self) -> tuple[str, str]:
+    @staticmethod
+    def load_prompts() -> tuple[str, str]:
         """Load prompt templates"""
         try:
             with open('prompts/moderator.txt', 'r') as f:
@@ -130,54 +237,58 @@ class WebRoundtableSession:
         self,
         participant_id: str,
         state: DiscussionState,
-        is_moderator: bool = False
+        is_moderator: bool = False,
+        stream: bool = False
     ) -> str:
-        """Generate response from LLM"""
-        moderator_prompt, panelist_prompt = self.load_prompts()
+        """Generate response from LLM, forwarding it to the browser as it streams if asked"""
+        # Format each new transcript message once; every participant's history
+        # shares the same string
+        lines = self.transcript_lines
+        for msg in state.transcript[len(lines):]:
+            lines.append(self.participant_prefixes[msg.participant_id] + msg.content)
         
-        # Prepare conversation history
-        history = []
-        for msg in state.transcript:
-            history.append({
-                "role": "assistant" if msg.participant_id == participant_id else "user",
-                "content": f"[{msg.participant_model}]: {msg.content}"
-            })
+        # Extend this participant's history with messages added since its last
+        # turn; earlier entries never change, so the provider's cached prompt
+        # prefix stays byte-identical from one turn to the next
+        history = self.histories.setdefault(participant_id, [])
+        for i in range(len(history), len(state.transcript)):
+            history.append(ChatMessage(
+                "assistant" if state.transcript[i].participant_id == participant_id else "user",
+                lines[i]
+            ))
         
         # If this is the first message, add default user message
-        if not history:
-            history.append({
-                "role": "user",
-                "content": f"Let's begin the discussion on: {state.topic}"
-            })
+        messages = history or [ChatMessage(
+            "user",
+            f"Let's begin the discussion on: {state.topic}"
+        )]
         
         # Select appropriate prompt
-        round_names = {
-            Round.AGENDA: "Agenda Framing",
-            Round.EVIDENCE: "Evidence Presentation", 
-            Round.CROSS_EXAMINATION: "Cross-Examination",
-            Round.CONVERGENCE: "Convergence"
-        }
-        
-        if is_moderator:
-            system_prompt = moderator_prompt.format(
-                round=state.current_round.value,
-                round_name=round_names[state.current_round]
-            )
-        else:
-            system_prompt = panelist_prompt.format(
-                round=state.current_round.value,
-                round_name=round_names[state.current_round]
-            )
+        system_prompt = self.system_prompts[state.current_round, is_moderator]
         
         # Generate response
         client = self.clients[participant_id]
         
         try:
-            response = await client.generate_response(
-                system_prompt=system_prompt,
-                messages=history,
-                temperature=0.7
-            )
+            if stream:
+                response = await self.ui.stream_message(
+                    participant_id,
+                    self.participant_models[participant_id],
+                    is_moderator,
+                    client.stream_response(
+                        system_prompt=system_prompt,
+                        messages=messages,
+                        temperature=0.7
+                    )
+                )
+                if not response.strip():
+                    raise ValueError(f"Empty response from {participant_id}")
+            else:
+                response = await client.generate_response(
+                    system_prompt=system_prompt,
+                    messages=messages,
+                    temperature=0.7
+                )
             return response
         except Exception as e:
             await self.ui.send_error(f"Error from {participant_id}: {str(e)}")
@@ -198,6 +309,8 @@ class WebRoundtableSession:
             started_at=datetime.now(),
             completed_at=None
         )
+        self.histories = {}
+        self.transcript_lines = []
         
         # Hide the prompt during discussion - no user input should be allowed
         await self.ws_manager.broadcast_to_client(self.websocket, {
@@ -208,98 +321,133 @@ class WebRoundtableSession:
         turn_number = 0
         retry_count = 0
         max_retries = 3
+        displayed_round = None
         
-        while self.current_state.status == "in_progress":
-            # Display current state
-            await self.ui.clear_screen()
-            await self.ui.display_header(topic, self.current_state.current_round)
-            
-            # Show recent messages (last 3)
-            for msg in self.current_state.transcript[-3:]:
-                await self.ui.display_message(msg)
-            
-            # Determine next speaker
-            next_speaker = self.turn_manager.determine_next_speaker(self.current_state)
-            self.current_state.current_speaker = next_speaker
-            
-            # Show thinking indicator
-            await self.ui.display_thinking(next_speaker)
-            
-            is_moderator = next_speaker == "claude_moderator"
-            
-            try:
-                response = await self.generate_response(
-                    next_speaker,
-                    self.current_state,
-                    is_moderator
+        # Log each message as it arrives; the full JSON snapshot is only written at the end
+        with self.logger.open_stream(self.current_state) as transcript_log:
+            while self.current_state.status == "in_progress":
+                # Everything shown before the requests go out travels as one frame
+                async with self.ui.batch():
+                    # Redraw the screen only when a round starts; within a round each
+                    # new message is appended to the client's terminal as it arrives
+                    if displayed_round is not self.current_state.current_round:
+                        displayed_round = self.current_state.current_round
+                        await self.ui.clear_screen()
+                        await self.ui.display_header(topic, displayed_round)
+                        
+                        # Show recent messages (last 3)
+                        for msg in self.current_state.transcript[-3:]:
+                            await self.ui.display_message(msg)
+                    
+                    # Determine next speakers; independent panelists are asked concurrently
+                    speakers = self.turn_manager.determine_next_speakers(self.current_state)
+                    self.current_state.current_speaker = speakers[0]
+                    
+                    # Show thinking indicators
+                    for speaker in speakers:
+                        await self.ui.display_thinking(speaker)
+                
+                # A lone speaker's reply is streamed to the browser as it arrives;
+                # concurrent replies are sent together once they're all in
+                stream = len(speakers) == 1
+                results = await asyncio.gather(
+                    *(self.generate_response(speaker, self.current_state, speaker == "claude_moderator", stream)
+                      for speaker in speakers),
+                    return_exceptions=True
                 )
-                retry_count = 0  # Reset on success
-            except Exception as e:
-                retry_count += 1
-                await self.ui.send_error(f"Error generating response (attempt {retry_count}/{max_retries}): {e}")
                 
-                if retry_count >= max_retries:
-                    await self.ui.send_error("Max retries exceeded. Exiting.")
-                    # Restore prompt on error
-                    await self.ws_manager.broadcast_to_client(self.websocket, {
-                        'type': 'prompt',
-                        'prompt': '$ '
-                    })
-                    return
+                # Add successful responses to the transcript in speaker order;
+                # the same clock read stamps them all and marks completion
+                now = datetime.now()
+                errors = []
+                async with self.ui.batch():
+                    for speaker, result in zip(speakers, results):
+                        if isinstance(result, BaseException):
+                            if not isinstance(result, Exception):
+                                raise result
+                            errors.append(result)
+                            continue
+                        
+                        is_moderator = speaker == "claude_moderator"
+                        message = Message(
+                            participant_id=speaker,
+                            participant_model=self.participant_models[speaker],
+                            role=Role.MODERATOR if is_moderator else Role.PANELIST,
+                            round=self.current_state.current_round,
+                            content=result,
+                            timestamp=now,
+                            turn_number=turn_number
+                        )
+                        
+                        self.current_state.transcript.append(message)
+                        # Session file I/O (here an fsync per message) runs in a worker
+                        # thread so other clients' sessions keep moving meanwhile
+                        await asyncio.to_thread(self.logger.append_message, transcript_log, message)
+                        if not stream:
+                            await self.ui.display_message(message)
+                        turn_number += 1
                 
-                await self.ui.send_output("Retrying in 3 seconds...")
-                await asyncio.sleep(3)
-                continue
-            
-            # Add to transcript
-            message = Message(
-                participant_id=next_speaker,
-                participant_model=self.participant_models[next_speaker],
-                role=Role.MODERATOR if is_moderator else Role.PANELIST,
-                round=self.current_state.current_round,
-                content=response,
-                timestamp=datetime.now(),
-                turn_number=turn_number
-            )
-            
-            self.current_state.transcript.append(message)
-            turn_number += 1
-            
-            # Check for round advancement
-            if self.turn_manager.should_advance_round(self.current_state):
-                if self.current_state.current_round == Round.CONVERGENCE:
-                    # Discussion complete
-                    self.current_state.status = "completed"
-                    self.current_state.completed_at = datetime.now()
-                    
-                    # Extract final consensus
-                    final_message = self.current_state.transcript[-1]
-                    await self.ui.display_final_consensus(final_message.content)
-                    
-                    # Save final state
-                    saved_path = self.logger.save_session(self.current_state)
-                    await self.ui.send_output(f"Discussion saved to: {saved_path}")
-                    
-                    # Return to main menu
-                    await self.ui.send_output("", "")
-                    await self.ui.send_output("Press Enter to return to main menu...", "system-message")
+                if not errors:
+                    retry_count = 0  # Reset on success
+                else:
+                    # Speakers that failed are still pending and are asked again next pass
+                    e = errors[0]
+                    retry_count += 1
+                    await self.ui.send_error(f"Error generating response (attempt {retry_count}/{max_retries}): {e}")
                     
-                    # Clear the current session for this client
-                    client_key = self.ws_manager._get_client_key(self.websocket)
-                    if client_key in self.ws_manager.client_sessions:
-                        del self.ws_manager.client_sessions[client_key]
+                    if retry_count >= max_retries:
+                        await self.ui.send_error("Max retries exceeded. Exiting.")
+                        # Restore prompt on error
+                        await self.ws_manager.broadcast_to_client(self.websocket, {
+                            'type': 'prompt',
+                            'prompt': '$ '
+                        })
+                        return
                     
-                    # Reset prompt to default
-                    await self.ws_manager.broadcast_to_client(self.websocket, {
-                        'type': 'prompt',
-                        'prompt': '$ '
-                    })
-                else:
-                    # Advance to next round
-                    old_round = self.current_state.current_round
-                    self.current_state.current_round = Round(old_round.value + 1)
-                    await self.ui.display_round_transition(old_round, self.current_state.current_round)
-                    await asyncio.sleep(2)
+                    await self.ui.send_output("Retrying in 3 seconds...")
+                    await asyncio.sleep(3)
+                    continue
+                
+                # Check for round advancement
+                if self.turn_manager.should_advance_round(self.current_state):
+                    if self.current_state.current_round == Round.CONVERGENCE:
+                        # Discussion complete
+                        self.current_state.status = "completed"
+                        self.current_state.completed_at = now
+                        
+                        # Extract final consensus
+                        final_message = self.current_state.transcript[-1]
+                        await self.ui.display_final_consensus(final_message.content)
+                        
+                        # Save final state
+                        saved_path = await asyncio.to_thread(self.logger.save_session, self.current_state)
+                        await self.ui.send_output(f"Discussion saved to: {saved_path}")
+                        
+                        # Return to main menu
+                        await self.ui.send_output("", "")
+                        await self.ui.send_output("Press Enter to return to main menu...", "system-message")
+                        
+                        # Clear the current session for this client
+                        client_key = self.ws_manager._get_client_key(self.websocket)
+                        if client_key in self.ws_manager.client_sessions:
+                            del self.ws_manager.client_sessions[client_key]
+                        
+                        # Reset prompt to default
+                        await self.ws_manager.broadcast_to_client(self.websocket, {
+                            'type': 'prompt',
+                            'prompt': '$ '
+                        })
+                    else:
+                        # Advance to next round
+                        old_round = self.current_state.current_round
+                        self.current_state.current_round = Round(old_round.value + 1)
+                        # The browser holds the transition on screen by itself, so the
+                        # next round's requests go out while it's displayed
+                        await self.ui.display_round_transition(old_round, self.current_state.current_round)
+        
+        if self.current_state.status == "completed":
+            # The snapshot now holds everything the log did
+            self.logger.stream_path(self.current_state).unlink(missing_ok=True)
 
 async def handle_client_message(websocket: WebSocketServerProtocol, message: dict, ws_manager: WebSocketManager):
     """Handle incoming client messages"""
@@ -307,57 +455,50 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
         command = message.get('command', '').strip()
         client_key = ws_manager._get_client_key(websocket)
         current_state = ws_manager.client_states.get(client_key, 'main_menu')
-        print(f"DEBUG: Received command '{command}' from {websocket.remote_address}, current state: {current_state}")
         logger.info(f"Received command '{command}' from {websocket.remote_address}, current state: {current_state}")
         
         if command.isdigit():
-            print(f"DEBUG: Command '{command}' is digit, checking session selection condition")
-            client_key = ws_manager._get_client_key(websocket)
-            current_state = ws_manager.client_states.get(client_key, 'main_menu')
-            print(f"DEBUG: Client key: {client_key}, Current state: {current_state}")
-            print(f"DEBUG: command.isdigit() = {command.isdigit()}")
-            print(f"DEBUG: current_state == 'session_selection' = {current_state == 'session_selection'}")
+            logger.debug("Command %r is digit, checking session selection condition", command)
             if current_state == 'session_selection':
                 # Session selection
-                print(f"DEBUG: Processing session selection: {command} for {websocket.remote_address}")
                 logger.info(f"Processing session selection: {command} for {websocket.remote_address}")
-                session_logger = SessionLogger() 
-                sessions = session_logger.list_sessions()
+                # Resolve the number against the listing the client was shown
+                session_logger = ws_manager.session_logger
+                sessions = ws_manager.session_lists.pop(client_key, None)
+                if sessions is None:
+                    sessions = await asyncio.to_thread(session_logger.list_sessions)
                 idx = int(command) - 1
                 
                 if 0 <= idx < len(sessions):
-                    state = session_logger.load_session(sessions[idx][0])
+                    state = await asyncio.to_thread(session_logger.load_session, sessions[idx][0])
                     if state:
                         # Replay session (simplified for web)
-                        await ws_manager.send_to_client(websocket, {
-                            'type': 'clear'
-                        })
-                        
-                        await ws_manager.send_to_client(websocket, {
-                            'type': 'header',
-                            'topic': state.topic,
-                            'round': 'Replay'
-                        })
-                        
-                        for msg in state.transcript:
-                            await ws_manager.send_to_client(websocket, {
+                        await ws_manager.send_many_to_client(websocket, [
+                            {
+                                'type': 'clear'
+                            },
+                            {
+                                'type': 'header',
+                                'topic': state.topic,
+                                'round': 'Replay'
+                            },
+                            *({
                                 'type': 'message',
                                 'participant_id': msg.participant_id,
                                 'participant_model': msg.participant_model,
                                 'content': msg.content,
-                                'is_moderator': msg.role == Role.MODERATOR
-                            })
-                        
-                        await ws_manager.send_to_client(websocket, {
-                            'type': 'output',
-                            'content': '\nPress Enter to return to menu...',
-                            'style': 'system-message'
-                        })
+                                'is_moderator': msg.role is Role.MODERATOR
+                            } for msg in state.transcript),
+                            {
+                                'type': 'output',
+                                'content': '\nPress Enter to return to menu...',
+                                'style': 'system-message'
+                            }
+                        ])
                         
                         # Set state to waiting for Enter to return to menu
-                        client_key = ws_manager._get_client_key(websocket)
                         ws_manager.client_states[client_key] = 'waiting_for_enter'
-                        print(f"DEBUG: Session loaded, state set to waiting_for_enter for {websocket.remote_address}")
+                        logger.debug("Session loaded, state set to waiting_for_enter for %s", websocket.remote_address)
                 else:
                     await ws_manager.send_to_client(websocket, {
                         'type': 'output',
@@ -366,11 +507,10 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
                     })
                     
                     # Reset client state on invalid selection
-                    client_key = ws_manager._get_client_key(websocket)
                     ws_manager.client_states[client_key] = 'main_menu'
             else:
                 # Not in session selection mode, treat as main menu command
-                print(f"DEBUG: Command '{command}' is digit but not in session_selection mode, treating as main menu")
+                logger.debug("Command %r is digit but not in session_selection mode, treating as main menu", command)
                 if command == '1':
                     # Start new discussion
                     await ws_manager.send_to_client(websocket, {
@@ -384,8 +524,7 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
                     })
                 elif command == '2':
                     # Load previous discussion
-                    session_logger = SessionLogger()
-                    sessions = session_logger.list_sessions()
+                    sessions = await asyncio.to_thread(ws_manager.session_logger.list_sessions)
                     
                     if not sessions:
                         await ws_manager.send_to_client(websocket, {
@@ -398,29 +537,27 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
                         })
                     else:
                         # Set client state to session selection mode
-                        client_key = ws_manager._get_client_key(websocket)
                         ws_manager.client_states[client_key] = 'session_selection'
-                        print(f"DEBUG: Client state set to session_selection for {websocket.remote_address}")
+                        ws_manager.session_lists[client_key] = sessions
                         logger.info(f"Client state set to session_selection for {websocket.remote_address}")
                         
-                        await ws_manager.send_to_client(websocket, {
-                            'type': 'output',
-                            'content': 'Saved Sessions:',
-                            'style': 'system-message'
-                        })
-                        
-                        for i, (filename, topic, timestamp) in enumerate(sessions[:10]):
-                            await ws_manager.send_to_client(websocket, {
+                        await ws_manager.send_many_to_client(websocket, [
+                            {
+                                'type': 'output',
+                                'content': 'Saved Sessions:',
+                                'style': 'system-message'
+                            },
+                            *({
                                 'type': 'output',
-                                'content': f"{i+1}. [{timestamp[:10]}] {topic}",
+                                'content': f"{i+1}. [{timestamp[:10]}] {topic}" + (" (interrupted)" if filename.endswith(".jsonl") else ""),
                                 'style': 'menu-option'
-                            })
-                        
-                        await ws_manager.send_to_client(websocket, {
-                            'type': 'output',
-                            'content': "Select session number (or 'c' to cancel):",
-                            'style': 'system-message'
-                        })
+                            } for i, (filename, topic, timestamp) in enumerate(sessions[:10])),
+                            {
+                                'type': 'output',
+                                'content': "Select session number (or 'c' to cancel):",
+                                'style': 'system-message'
+                            }
+                        ])
                 elif command == '3':
                     # Exit
                     await ws_manager.send_to_client(websocket, {
@@ -439,69 +576,7 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
                         'type': 'menu'
                     })
         
-        elif command == '1':
-            # Start new discussion
-            await ws_manager.send_to_client(websocket, {
-                'type': 'output',
-                'content': 'Enter discussion topic:',
-                'style': 'system-message'
-            })
-            await ws_manager.send_to_client(websocket, {
-                'type': 'prompt',
-                'prompt': 'Topic: '
-            })
-            
-        elif command == '2':
-            # Load previous discussion
-            session_logger = SessionLogger()
-            sessions = session_logger.list_sessions()
-            
-            if not sessions:
-                await ws_manager.send_to_client(websocket, {
-                    'type': 'output',
-                    'content': 'No saved sessions found.',
-                    'style': 'system-message'
-                })
-                await ws_manager.send_to_client(websocket, {
-                    'type': 'menu'
-                })
-            else:
-                # Set client state to session selection mode
-                client_key = ws_manager._get_client_key(websocket)
-                ws_manager.client_states[client_key] = 'session_selection'
-                print(f"DEBUG: Client state set to session_selection for {websocket.remote_address}")
-                logger.info(f"Client state set to session_selection for {websocket.remote_address}")
-                
-                await ws_manager.send_to_client(websocket, {
-                    'type': 'output',
-                    'content': 'Saved Sessions:',
-                    'style': 'system-message'
-                })
-                
-                for i, (filename, topic, timestamp) in enumerate(sessions[:10]):
-                    await ws_manager.send_to_client(websocket, {
-                        'type': 'output',
-                        'content': f"{i+1}. [{timestamp[:10]}] {topic}",
-                        'style': 'menu-option'
-                    })
-                
-                await ws_manager.send_to_client(websocket, {
-                    'type': 'output',
-                    'content': "Select session number (or 'c' to cancel):",
-                    'style': 'system-message'
-                })
-                
-        elif command == '3':
-            # Exit
-            await ws_manager.send_to_client(websocket, {
-                'type': 'output',
-                'content': 'Thank you for using Roundtable!',
-                'style': 'system-message'
-            })
-            await websocket.close()
-            
         elif command == 'help':
-            client_key = ws_manager._get_client_key(websocket)
             ws_manager.client_states[client_key] = 'main_menu'
             await ws_manager.send_to_client(websocket, {
                 'type': 'menu'
@@ -512,7 +587,6 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
             topic = command[7:].strip()
             if topic:
                 try:
-                    client_key = ws_manager._get_client_key(websocket)
                     session = WebRoundtableSession(ws_manager, websocket)
                     ws_manager.client_sessions[client_key] = session
                     await session.run_discussion(topic)
@@ -535,12 +609,11 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
         
 
         
-        elif ws_manager.client_sessions.get(ws_manager._get_client_key(websocket)) is None and len(command) > 0 and not command.isdigit() and command not in ['1', '2', '3', 'help', 'c'] and ws_manager.client_states.get(ws_manager._get_client_key(websocket)) != 'session_selection':
+        elif ws_manager.client_sessions.get(client_key) is None and len(command) > 0 and not command.isdigit() and command not in {'1', '2', '3', 'help', 'c'} and current_state != 'session_selection':
             # Handle topic input directly (when not in a session and not a menu command)
             topic = command.strip()
             if topic:
                 try:
-                    client_key = ws_manager._get_client_key(websocket)
                     session = WebRoundtableSession(ws_manager, websocket)
                     ws_manager.client_sessions[client_key] = session
                     await session.run_discussion(topic)
@@ -563,7 +636,6 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
         
         elif command.lower() == 'c':
             # Cancel - return to menu
-            client_key = ws_manager._get_client_key(websocket)
             ws_manager.client_states[client_key] = 'main_menu'
             await ws_manager.send_to_client(websocket, {
                 'type': 'menu'
@@ -571,21 +643,18 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
             
         elif not command:
             # Enter pressed - return to menu (for replay mode or after discussion completion)
-            print(f"DEBUG: Empty command received (Enter pressed) from {websocket.remote_address}")
-            client_key = ws_manager._get_client_key(websocket)
-            current_state = ws_manager.client_states.get(client_key, 'main_menu')
-            print(f"DEBUG: Current state when Enter pressed: {current_state}")
+            logger.debug("Empty command received (Enter pressed) from %s in state %s", websocket.remote_address, current_state)
             
             if current_state == 'waiting_for_enter':
                 # User pressed Enter after viewing a session, return to main menu
-                print(f"DEBUG: User pressed Enter in waiting_for_enter state, returning to main menu")
+                logger.debug("User pressed Enter in waiting_for_enter state, returning to main menu")
                 ws_manager.client_states[client_key] = 'main_menu'
                 await ws_manager.send_to_client(websocket, {
                     'type': 'menu'
                 })
             else:
                 # Default behavior for Enter in other states
-                print(f"DEBUG: User pressed Enter in {current_state} state, returning to main menu")
+                logger.debug("User pressed Enter in %s state, returning to main menu", current_state)
                 ws_manager.client_states[client_key] = 'main_menu'
                 await ws_manager.send_to_client(websocket, {
                     'type': 'menu'
@@ -611,13 +680,16 @@ async def handle_client_message(websocket: WebSocketServerProtocol, message: dic
 
 async def websocket_handler(websocket: WebSocketServerProtocol, path: str, ws_manager: WebSocketManager):
     """Handle WebSocket connections"""
+    # A discussion runs inside its client's handler, so shutdown cancels it here
+    task = asyncio.current_task()
+    ws_manager.handler_tasks.add(task)
     try:
         await ws_manager.register_client(websocket)
         logger.info(f"Client registered successfully: {websocket.remote_address}")
         
         async for raw_message in websocket:
             try:
-                message = json.loads(raw_message)
+                message = _loads(raw_message)
                 await handle_client_message(websocket, message, ws_manager)
             except json.JSONDecodeError as e:
                 logger.error(f"JSON decode error: {e}")
@@ -641,11 +713,13 @@ async def websocket_handler(websocket: WebSocketServerProtocol, path: str, ws_ma
         logger.error(f"Unexpected error in websocket handler: {e}")
         logger.error(f"Traceback: {traceback.format_exc()}")
     finally:
+        ws_manager.handler_tasks.discard(task)
         await ws_manager.unregister_client(websocket)
 
-async def start_server(host='localhost', port=8000):
+async def start_server(host='localhost', port=8000, ws_manager: Optional[WebSocketManager] = None):
     """Start the WebSocket server"""
-    ws_manager = WebSocketManager()
+    ws_manager = ws_manager or WebSocketManager()
+    WebRoundtableSession.shared_system_prompts()
     
     logger.info(f"Starting Roundtable WebSocket server on {host}:{port}")
     
@@ -657,12 +731,16 @@ async def start_server(host='localhost', port=8000):
     
     return server
 
+# Run standalone from the repo root with: python -m web.server
 if __name__ == "__main__":
     async def main():
         server = await start_server()
         await server.wait_closed()
     
     try:
-        asyncio.run(main())
+        if UVLOOP_AVAILABLE:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
\ No newline at end of file
@@ -10,6 +10,8 @@ class WebTerminal {
         this.commandHistory = [];
         this.historyIndex = -1;
         this.currentInput = '';
+        this.heldEvents = null;  // Queued while a round transition is on screen
+        this.streamingContent = null;  // Content element of the message being streamed
         
         this.init();
     }
@@ -176,6 +178,11 @@ class WebTerminal {
     }
     
     handleServerMessage(data) {
+        if (this.heldEvents) {
+            this.heldEvents.push(data);
+            return;
+        }
+        
         switch(data.type) {
             case 'output':
                 this.appendOutput(data.content, data.style || '');
@@ -186,6 +193,14 @@ class WebTerminal {
             case 'message':
                 this.displayMessage(data);
                 break;
+            case 'message_start':
+                this.streamingContent = this.displayMessage({...data, content: ''});
+                break;
+            case 'message_delta':
+                if (this.streamingContent) {
+                    this.streamingContent.textContent += data.delta;
+                }
+                break;
             case 'header':
                 this.displayHeader(data.topic, data.round);
                 break;
@@ -194,6 +209,9 @@ class WebTerminal {
                 break;
             case 'round_transition':
                 this.displayRoundTransition(data.from_round, data.to_round);
+                if (data.hold_ms) {
+                    this.holdEvents(data.hold_ms);
+                }
                 break;
             case 'final_consensus':
                 this.displayFinalConsensus(data.content);
@@ -204,6 +222,10 @@ class WebTerminal {
             case 'prompt':
                 this.setPrompt(data.prompt || '$ ');
                 break;
+            case 'batch':
+                // Several events sent as one frame; apply them in order
+                data.events.forEach(event => this.handleServerMessage(event));
+                break;
         }
         
         // Auto-scroll to bottom
@@ -224,6 +246,9 @@ class WebTerminal {
     }
     
     displayMessage(data) {
+        // Replies replace the "formulating" lines rather than piling up below them
+        this.output.querySelectorAll('.thinking').forEach(el => el.remove());
+        
         const messageDiv = document.createElement('div');
         messageDiv.className = 'message';
         
@@ -239,6 +264,7 @@ class WebTerminal {
         messageDiv.appendChild(header);
         messageDiv.appendChild(content);
         this.output.appendChild(messageDiv);
+        return content;
     }
     
     displayHeader(topic, round) {
@@ -249,6 +275,16 @@ class WebTerminal {
         this.appendOutput('─'.repeat(80), 'separator');
     }
     
+    holdEvents(ms) {
+        // Keep the current screen up for ms, then apply whatever arrived meanwhile
+        this.heldEvents = [];
+        setTimeout(() => {
+            const events = this.heldEvents;
+            this.heldEvents = null;
+            events.forEach(event => this.handleServerMessage(event));
+        }, ms);
+    }
+    
     displayRoundTransition(fromRound, toRound) {
         this.appendOutput('='.repeat(80), 'separator');
         this.appendOutput(`✓ Completed: ${fromRound}`, 'system-message');
@@ -1,21 +1,41 @@
-from typing import TYPE_CHECKING
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
 from models.discussion import Round, Message, Role
 
 if TYPE_CHECKING:
     from web.server import WebSocketManager
 
+# How long the browser keeps a round transition on screen before applying
+# the events that follow it
+ROUND_TRANSITION_HOLD_MS = 2000
+
+# Minimum seconds between frames of a streaming response; chunks that arrive
+# in between are sent together
+STREAM_FLUSH_INTERVAL = 0.05
+
+ROUND_NAMES = {
+    Round.AGENDA: "Agenda Framing",
+    Round.EVIDENCE: "Evidence Presentation",
+    Round.CROSS_EXAMINATION: "Cross-Examination",
+    Round.CONVERGENCE: "Convergence"
+}
+
+# Display names for the thinking indicator
+PARTICIPANT_NAMES = {
+    "claude_moderator": "Claude Moderator",
+    "claude": "Claude",
+    "gpt5": "GPT-5",
+    "gemini": "Gemini"
+}
+
 class WebUI:
     """Web-based UI that mirrors the terminal UI functionality"""
     
     def __init__(self, websocket_manager: 'WebSocketManager', websocket=None):
         self.ws_manager = websocket_manager
         self.websocket = websocket  # Specific websocket for this UI instance
-        self.round_names = {
-            Round.AGENDA: "Agenda Framing",
-            Round.EVIDENCE: "Evidence Presentation",
-            Round.CROSS_EXAMINATION: "Cross-Examination",
-            Round.CONVERGENCE: "Convergence"
-        }
+        self.round_names = ROUND_NAMES
         
         self.participant_colors = {
             "gpt5": "cyan",
@@ -23,19 +43,42 @@ class WebUI:
             "gemini": "yellow",
             "claude_moderator": "magenta"
         }
+        # Events held back while inside batch()
+        self._pending: Optional[List[dict]] = None
     
-    async def clear_screen(self):
-        """Clear the web terminal screen"""
-        if self.websocket:
-            await self.ws_manager.broadcast_to_client(self.websocket, {
-                'type': 'clear'
-            })
+    async def _send(self, message: dict):
+        if self._pending is not None:
+            self._pending.append(message)
+        elif self.websocket:
+            await self.ws_manager.broadcast_to_client(self.websocket, message)
         else:
             # Fallback to broadcast if no specific websocket (backward compatibility)
-            for client in self.ws_manager.clients:
-                await self.ws_manager.send_to_client(client, {
-                    'type': 'clear'
-                })
+            await self.ws_manager.broadcast(message)
+    
+    @asynccontextmanager
+    async def batch(self):
+        """Collect the events sent inside the block and deliver them as one
+        'batch' frame, which the client unpacks in order"""
+        if self._pending is not None:
+            # Already batching; the outer block sends everything
+            yield
+            return
+        
+        self._pending = []
+        try:
+            yield
+        finally:
+            events, self._pending = self._pending, None
+            if len(events) == 1:
+                await self._send(events[0])
+            elif events:
+                await self._send({'type': 'batch', 'events': events})
+    
+    async def clear_screen(self):
+        """Clear the web terminal screen"""
+        await self._send({
+            'type': 'clear'
+        })
     
     async def display_header(self, topic: str, current_round: Round):
         """Display discussion header"""
@@ -44,11 +87,7 @@ class WebUI:
             'topic': topic,
             'round': self.round_names[current_round]
         }
-        if self.websocket:
-            await self.ws_manager.broadcast_to_client(self.websocket, message)
-        else:
-            for client in self.ws_manager.clients:
-                await self.ws_manager.send_to_client(client, message)
+        await self._send(message)
     
     async def display_message(self, message: Message):
         """Display a single message"""
@@ -57,45 +96,61 @@ class WebUI:
             'participant_id': message.participant_id,
             'participant_model': message.participant_model,
             'content': message.content,
-            'is_moderator': message.role == Role.MODERATOR
+            'is_moderator': message.role is Role.MODERATOR
         }
-        if self.websocket:
-            await self.ws_manager.broadcast_to_client(self.websocket, msg)
-        else:
-            for client in self.ws_manager.clients:
-                await self.ws_manager.send_to_client(client, msg)
+        await self._send(msg)
+    
+    async def stream_message(
+        self,
+        participant_id: str,
+        participant_model: str,
+        is_moderator: bool,
+        chunks: AsyncIterator[str]
+    ) -> str:
+        """Forward a response to the browser as it streams in and return the full text.
+        
+        The message only opens once text arrives; until then the client may
+        still be retrying, and the thinking indicator stays up.
+        """
+        parts = []
+        sent = 0
+        last_flush = time.monotonic()
+        async for chunk in chunks:
+            if not parts:
+                await self._send({
+                    'type': 'message_start',
+                    'participant_id': participant_id,
+                    'participant_model': participant_model,
+                    'is_moderator': is_moderator
+                })
+            parts.append(chunk)
+            now = time.monotonic()
+            if now - last_flush >= STREAM_FLUSH_INTERVAL:
+                await self._send({'type': 'message_delta', 'delta': "".join(parts[sent:])})
+                sent = len(parts)
+                last_flush = now
+        
+        if sent < len(parts):
+            await self._send({'type': 'message_delta', 'delta': "".join(parts[sent:])})
+        return "".join(parts)
     
     async def display_thinking(self, participant: str):
         """Show thinking indicator"""
-        participant_names = {
-            "claude_moderator": "Claude Moderator",
-            "claude": "Claude",
-            "gpt5": "GPT-5",
-            "gemini": "Gemini"
-        }
-        
         msg = {
             'type': 'thinking',
-            'participant': participant_names.get(participant, participant)
+            'participant': PARTICIPANT_NAMES.get(participant, participant)
         }
-        if self.websocket:
-            await self.ws_manager.broadcast_to_client(self.websocket, msg)
-        else:
-            for client in self.ws_manager.clients:
-                await self.ws_manager.send_to_client(client, msg)
+        await self._send(msg)
     
     async def display_round_transition(self, from_round: Round, to_round: Round):
         """Display round transition"""
         msg = {
             'type': 'round_transition',
             'from_round': self.round_names[from_round],
-            'to_round': self.round_names[to_round]
+            'to_round': self.round_names[to_round],
+            'hold_ms': ROUND_TRANSITION_HOLD_MS
         }
-        if self.websocket:
-            await self.ws_manager.broadcast_to_client(self.websocket, msg)
-        else:
-            for client in self.ws_manager.clients:
-                await self.ws_manager.send_to_client(client, msg)
+        await self._send(msg)
     
     async def display_final_consensus(self, consensus: str):
         """Display final consensus"""
@@ -103,11 +158,7 @@ class WebUI:
             'type': 'final_consensus',
             'content': consensus
         }
-        if self.websocket:
-            await self.ws_manager.broadcast_to_client(self.websocket, msg)
-        else:
-            for client in self.ws_manager.clients:
-                await self.ws_manager.send_to_client(client, msg)
+        await self._send(msg)
     
     async def send_output(self, content: str, style: str = ''):
         """Send general output message"""
@@ -116,11 +167,7 @@ class WebUI:
             'content': content,
             'style': style
         }
-        if self.websocket:
-            await self.ws_manager.broadcast_to_client(self.websocket, msg)
-        else:
-            for client in self.ws_manager.clients:
-                await self.ws_manager.send_to_client(client, msg)
+        await self._send(msg)
     
     async def send_error(self, content: str):
         """Send error message"""
@@ -129,8 +176,4 @@ class WebUI:
             'content': content,
             'style': 'error-message'
         }
-        if self.websocket:
-            await self.ws_manager.broadcast_to_client(self.websocket, msg)
-        else:
-            for client in self.ws_manager.clients:
-                await self.ws_manager.send_to_client(client, msg)
\ No newline at end of file
+        await self._send(msg)
\ No newline at end of file
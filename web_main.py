@@ -4,21 +4,31 @@ import json
 import logging
 import os
 import signal
-import sys
 from pathlib import Path
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from threading import Thread
 from urllib.parse import urlparse
 import websockets
 
-# Add current directory to path
-sys.path.insert(0, str(Path(__file__).parent))
+# uvloop's libuv-based event loop dispatches socket I/O faster than the
+# default selector loop; fall back to asyncio when it isn't installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
-from web.server import start_server
+from web.server import WebSocketManager, start_server
+from llm.base import close_shared_clients
+from config import validate as validate_config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds to let in-flight discussions finish after a shutdown signal before
+# they are cancelled
+SHUTDOWN_GRACE_SECONDS = 5
+
 class RoundtableHTTPHandler(SimpleHTTPRequestHandler):
     """Custom HTTP handler that serves files from the web directory"""
     
@@ -43,22 +53,37 @@ class RoundtableHTTPHandler(SimpleHTTPRequestHandler):
         
         return super().do_GET()
 
-def run_http_server(port=8080):
-    """Run the HTTP server to serve static files"""
+def run_http_server(httpd: ThreadingHTTPServer):
+    """Serve static files until httpd.shutdown() is called"""
     try:
-        httpd = HTTPServer(('localhost', port), RoundtableHTTPHandler)
-        logger.info(f"HTTP server running on http://localhost:{port}")
+        logger.info(f"HTTP server running on http://localhost:{httpd.server_address[1]}")
         httpd.serve_forever()
     except Exception as e:
         logger.error(f"HTTP server error: {e}")
+    finally:
+        httpd.server_close()
 
-async def run_websocket_server(port=8000):
-    """Run the WebSocket server"""
+async def run_websocket_server(shutdown_event: asyncio.Event, port=8000):
+    """Run the WebSocket server until shutdown_event is set"""
+    ws_manager = WebSocketManager()
     try:
-        server = await start_server('localhost', port)
-        await server.wait_closed()
+        server = await start_server('localhost', port, ws_manager)
+        await shutdown_event.wait()
+        # Send connected browsers a close frame rather than dropping the sockets
+        server.close()
+        try:
+            # Closing waits for every connection handler to return, and a
+            # discussion keeps its handler busy until it ends
+            await asyncio.wait_for(server.wait_closed(), SHUTDOWN_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            logger.info("Cancelling discussions still in progress")
+            ws_manager.cancel_handlers()
+            await server.wait_closed()
     except Exception as e:
         logger.error(f"WebSocket server error: {e}")
+    finally:
+        # Sessions share pooled provider connections; close them with the server
+        await close_shared_clients()
 
 async def main():
     """Main function to run both servers"""
@@ -70,7 +95,9 @@ async def main():
     print()
     
     # Start HTTP server in a separate thread
-    http_thread = Thread(target=run_http_server, args=(8080,), daemon=True)
+    # One thread per request, so a slow asset fetch doesn't hold up other browsers
+    httpd = ThreadingHTTPServer(('localhost', 8080), RoundtableHTTPHandler)
+    http_thread = Thread(target=run_http_server, args=(httpd,), daemon=True)
     http_thread.start()
     
     print(f"✓ HTTP Server: http://localhost:8080")
@@ -82,19 +109,40 @@ async def main():
     print("="*80)
     print()
     
-    # Handle graceful shutdown
-    def signal_handler(signum, frame):
-        logger.info("\nShutting down servers...")
-        sys.exit(0)
+    # Handle graceful shutdown: signals only wake the loop, which then closes
+    # both servers in order
+    shutdown_event = asyncio.Event()
+    main_task = asyncio.current_task()
+    
+    def request_shutdown():
+        if shutdown_event.is_set():
+            # Second signal: stop waiting on anything and exit now
+            main_task.cancel()
+        else:
+            logger.info("Shutting down servers (press Ctrl+C again to force)...")
+            shutdown_event.set()
     
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, request_shutdown)
+        except NotImplementedError:
+            # Windows event loops don't support signal handlers; Ctrl+C
+            # still arrives as KeyboardInterrupt
+            pass
     
     # Run WebSocket server
     try:
-        await run_websocket_server(8000)
-    except KeyboardInterrupt:
+        await run_websocket_server(shutdown_event, 8000)
+    except (KeyboardInterrupt, asyncio.CancelledError):
         logger.info("Servers stopped by user")
+    finally:
+        httpd.shutdown()
+        http_thread.join(timeout=2)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    validate_config()
+    if UVLOOP_AVAILABLE:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file